@@ -7,14 +7,16 @@ To-do:
 - default values for schedule and options
 """
 
-from __future__ import division
 from time import time
 import os
-import scipy as s
+import numpy as np
 import pandas as pd
 import sys
+from functools import partial
+from joblib import Parallel, delayed
 
 from .variational_nodes import Variational_Node
+from .multiview_nodes import Multiview_Node
 from .utils import corr, nans
 
 
@@ -37,9 +39,35 @@ class BayesNet(object):
         self.nodes = nodes
         self.options = options
 
+        # Views of multi-view nodes are updated in parallel using threads, the numerical routines release the GIL
+        if self.options.get('cores',1) > 1:
+            self.parallel = Parallel(n_jobs=self.options.get('cores',1), prefer="threads")
+        else:
+            self.parallel = None
+
+        # Resolve the schedule of updates into the update methods of the nodes
+        self.schedule = []
+        for node in self.options["schedule"]:
+            if self.parallel is not None and isinstance(self.nodes[node],Multiview_Node):
+                update = partial(self.updateViews, self.nodes[node])
+            else:
+                update = self.nodes[node].update
+            self.schedule.append((node,update))
+
         # Training flag
         self.trained = False
 
+    def updateViews(self, node):
+        """Method to update the views of a multi-view node in parallel
+
+        PARAMETERS
+        ----------
+        node: Multiview_Node
+            node whose active views are updated
+        """
+        views = node.getNodes()
+        self.parallel(delayed(views[m].update)() for m in node.activeM)
+
     def removeInactiveFactors(self, by_norm=0, by_r2=0):
         """Method to remove inactive factors
 
@@ -56,10 +84,10 @@ class BayesNet(object):
         # Shut down based on norm of latent variable vectors
         if by_norm > 0:
             Z = self.nodes["Z"].getExpectation()
-            drop_dic["by_norm"] = s.where((Z**2).mean(axis=0) < by_norm)[0]
+            drop_dic["by_norm"] = np.where((Z**2).mean(axis=0) < by_norm)[0]
             if len(drop_dic["by_norm"]) > 0:
                 print("\n...A Factor has a norm smaller than {0}, dropping it and recomputing ELBO...\n".format(by_norm))
-                drop_dic["by_norm"] = [ s.random.choice(drop_dic["by_norm"]) ]
+                drop_dic["by_norm"] = [ np.random.choice(drop_dic["by_norm"]) ]
 
         # Shut down based on coefficient of determination with respect to the residual variance
         #   Advantages: it takes into account both weights and latent variables, is based on how well the model fits the data
@@ -68,7 +96,7 @@ class BayesNet(object):
             Z = self.nodes['Z'].getExpectation()
             Y = self.nodes["Y"].getExpectation()
             W = self.nodes["SW"].getExpectation()
-            all_r2 = s.zeros([self.dim['M'], self.dim['K']])
+            all_r2 = np.zeros([self.dim['M'], self.dim['K']])
             initial_k = 0
             for m in range(self.dim['M']):
 
@@ -79,34 +107,34 @@ class BayesNet(object):
                 Ym = Y[m].data.copy()
 
                 # If there is an intercept term, regress it out
-                if s.all(Z[:,0]==1.):
+                if np.all(Z[:,0]==1.):
                     Ym -= W[m][:,0]
                     all_r2[:,0] = 1.
                     initial_k = 1
 
                 # Subtract mean and compute sum of squares (denominator)
                 # Ym[mask] = 0.
-                # Ym -= s.mean(Ym, axis=0)
+                # Ym -= np.mean(Ym, axis=0)
                 # Ym[mask] = 0.
 
 
                 # Compute R2
                 SS = (Ym**2.).sum()
                 for k in range(initial_k,self.dim['K']):
-                    Ypred_mk = s.outer(Z[:,k], W[m][:,k])
+                    Ypred_mk = np.outer(Z[:,k], W[m][:,k])
                     Ypred_mk[mask] = 0.
                     Res = ((Ym - Ypred_mk)**2.).sum()
                     all_r2[m,k] = 1. - Res/SS
 
             # Select factor to remove. If multiple, then just pick one at random.
-            drop_dic["by_r2"] = s.where( (all_r2>by_r2).sum(axis=0) == 0)[0] 
-            # drop_dic["by_r2"] = s.where( ((all_r2)>by_r2+1e-16).sum(axis=0) == 0)[0] 
+            drop_dic["by_r2"] = np.where( (all_r2>by_r2).sum(axis=0) == 0)[0] 
+            # drop_dic["by_r2"] = np.where( ((all_r2)>by_r2+1e-16).sum(axis=0) == 0)[0] 
             if len(drop_dic["by_r2"]) > 0: 
                 print("\n...A Factor explains less than {0}% of variance, dropping it and recomputing ELBO...\n".format(by_r2*100))
-                drop_dic["by_r2"] = [ s.random.choice(drop_dic["by_r2"]) ] # drop one factor at a time
+                drop_dic["by_r2"] = [ np.random.choice(drop_dic["by_r2"]) ] # drop one factor at a time
 
         # Drop the factors
-        drop = s.unique(s.concatenate(list(drop_dic.values())))
+        drop = np.unique(np.concatenate(list(drop_dic.values())))
         if len(drop) > 0:
             for node in self.nodes.keys():
                 self.nodes[node].removeFactors(drop)
@@ -125,8 +153,11 @@ class BayesNet(object):
 
         # Define some variables to monitor training
         nodes = list(self.getVariationalNodes().keys())
-        elbo = pd.DataFrame(data = nans((self.options['maxiter'], len(nodes)+1 )), columns = nodes+["total"] )
+        elbo = nans((self.options['maxiter'], len(nodes)+1))
         activeK = nans((self.options['maxiter']))
+
+        # Number of consecutive ELBO evaluations whose change is below the tolerance
+        stalled = 0
         
         # Precompute updates
         for n in self.nodes:
@@ -142,37 +173,40 @@ class BayesNet(object):
                 activeK[i] = self.dim["K"]
 
             # Update node by node, with E and M step merged
-            for node in self.options["schedule"]:
+            for node, update in self.schedule:
                 if node=="Theta" and i<self.options['startSparsity']:
                     continue
-                self.nodes[node].update()
+                update()
 
             # if i==self.options['startSparsity'] and "Theta" in self.options["schedule"]:
             #     print("\n...Activating sparsity, recomputing ELBO...\n")
 
             # Calculate Evidence Lower Bound
             if (i+1) % self.options['elbofreq'] == 0 and activeK[i]==activeK[i-1] and i!=self.options['startSparsity']:
-                elbo.iloc[i] = self.calculateELBO()
+                elbo[i,:] = self.calculateELBO().values
 
                 # Print first iteration
                 if i==0:
-                    print("Iteration 1: time=%.2f ELBO=%.2f, Factors=%d" % (time()-t,elbo.iloc[i]["total"], (~self.nodes["Z"].covariates).sum() ))
+                    print("Iteration 1: time=%.2f ELBO=%.2f, Factors=%d" % (time()-t,elbo[i,-1], (~self.nodes["Z"].covariates).sum() ))
                     if self.options['verbose']:
-                        print("".join([ "%s=%.2f  " % (k,v) for k,v in elbo.iloc[i].drop("total").iteritems() ]) + "\n")
+                        print("".join([ "%s=%.2f  " % (k,v) for k,v in zip(nodes,elbo[i,:-1]) ]) + "\n")
 
                 else:
                     # Check convergence using the ELBO
-                    delta_elbo = elbo.iloc[i]["total"]-elbo.iloc[i-self.options['elbofreq']]["total"]
+                    delta_elbo = elbo[i,-1]-elbo[i-self.options['elbofreq'],-1]
 
                     # Print ELBO monitoring
-                    if not s.isnan(delta_elbo):
-                        print("Iteration %d: time=%.2f ELBO=%.2f, deltaELBO=%.4f, Factors=%d" % (i+1, time()-t, elbo.iloc[i]["total"], delta_elbo, (~self.nodes["Z"].covariates).sum() ))
+                    if not np.isnan(delta_elbo):
+                        print("Iteration %d: time=%.2f ELBO=%.2f, deltaELBO=%.4f, Factors=%d" % (i+1, time()-t, elbo[i,-1], delta_elbo, (~self.nodes["Z"].covariates).sum() ))
                     if self.options['verbose']:
-                        print("".join([ "%s=%.2f  " % (k,v) for k,v in elbo.iloc[i].drop("total").iteritems() ]) + "\n")
+                        print("".join([ "%s=%.2f  " % (k,v) for k,v in zip(nodes,elbo[i,:-1]) ]) + "\n")
                     if delta_elbo<0 and i!=self.options['startSparsity'] and self.options['verbose']: print("Warning, lower bound is decreasing..."); print('\a')
 
-                    # Assess convergence
-                    if (0 <= delta_elbo < self.options['tolerance']) and (not self.options['forceiter']):
+                    # Assess convergence, also stopping when the ELBO keeps fluctuating within the tolerance
+                    # without increasing (i.e. small numerical decreases)
+                    stalled = stalled+1 if abs(delta_elbo) < self.options['tolerance'] else 0
+                    converged = (0 <= delta_elbo < self.options['tolerance']) or (stalled >= self.options.get('patience',5))
+                    if converged and (not self.options['forceiter']):
                         activeK = activeK[:(i+1)]
                         elbo = elbo[:(i+1)]
                         print ("Converged!\n")
@@ -186,7 +220,7 @@ class BayesNet(object):
             sys.stdout.flush()
 
         # Finish by collecting the training statistics
-        self.train_stats = { 'activeK':activeK, 'elbo':elbo["total"].values, 'elbo_terms':elbo.drop("total",1) }
+        self.train_stats = { 'activeK':activeK, 'elbo':elbo[:,-1], 'elbo_terms':pd.DataFrame(elbo[:,:-1], columns=nodes) }
         self.trained = True
 
     def getParameters(self, *nodes):
@@ -255,8 +289,6 @@ class BayesNet(object):
             list/tuple with the name of the nodes
         """
         if len(nodes) == 0: nodes = self.getVariationalNodes().keys()
-        elbo = pd.Series(s.zeros(len(nodes)+1), index=list(nodes)+["total"])
-        for node in nodes:
-            elbo[node] = float(self.nodes[node].calculateELBO())
-            elbo["total"] += elbo[node]
+        lb = [ float(self.nodes[node].calculateELBO()) for node in nodes ]
+        elbo = pd.Series(lb+[sum(lb)], index=list(nodes)+["total"])
         return elbo
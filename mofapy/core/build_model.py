@@ -2,12 +2,10 @@
 Module with functions to build the model
 """
 
-import scipy as s
 from sys import path
 from time import time,sleep
 import pandas as pd
 import numpy as np
-#from joblib import Parallel, delayed
 
 from .init_nodes import *
 from .BayesNet import BayesNet
@@ -35,7 +33,7 @@ def runMOFA(data, data_opts, model_opts, train_opts, seed=None):
     # set the seed
     if seed is None or seed==0:
         seed = int(round(time()*1000)%1e6)
-    s.random.seed(seed)
+    np.random.seed(seed)
 
 
 
@@ -64,7 +62,7 @@ def runMOFA(data, data_opts, model_opts, train_opts, seed=None):
     # Define dimensionalities
     M = len(data)
     N = data[0].shape[0]
-    D = s.asarray([ data[m].shape[1] for m in range(M) ])
+    D = np.asarray([ data[m].shape[1] for m in range(M) ])
     K = model_opts["factors"]
     dim = {'M':M, 'N':N, 'D':D, 'K':K }
 
@@ -94,10 +92,10 @@ def runMOFA(data, data_opts, model_opts, train_opts, seed=None):
                  qa=model_opts["initTau"]['a'], qb=model_opts["initTau"]['b'], qE=model_opts["initTau"]['E'])
 
     # Sparsity on the weights
-    if len(s.unique(model_opts['sparsity'])) == 1:
+    if len(np.unique(model_opts['sparsity'])) == 1:
 
         # All are infered
-        if s.unique(model_opts['sparsity'])==1.:
+        if np.unique(model_opts['sparsity'])==1.:
             # init.initThetaLearn(pa=model_opts["priorTheta"]['a'], pb=model_opts["priorTheta"]['b'],
             #     qa=model_opts["initTheta"]['a'],  qb=model_opts["initTheta"]['b'], qE=model_opts["initTheta"]['E'])
             init.initThetaMixed(pa=model_opts["priorTheta"]['a'], pb=model_opts["priorTheta"]['b'],
@@ -105,7 +103,7 @@ def runMOFA(data, data_opts, model_opts, train_opts, seed=None):
                 sparsity=model_opts['sparsity'])
 
         # None are infered
-        elif s.unique(model_opts['sparsity'])==0.:
+        elif np.unique(model_opts['sparsity'])==0.:
             init.initThetaConst(value=model_opts["initTheta"]['E'])
 
     # Some are infered
@@ -9,8 +9,8 @@ attributes and are not always necessarily equal due to E and M steps in the VB a
 
 """
 
-import scipy as s
-import numpy.linalg as linalg
+import numpy as np
+import scipy.linalg as linalg
 import scipy.special as special
 import scipy.stats as stats
 
@@ -58,8 +58,8 @@ class Distribution(object):
 
     def CheckDimensionalities(self):
         """ General method to do a sanity check on the dimensionalities """
-        # p_dim = set(map(s.shape, self.params.values()))
-        e_dim = set(map(s.shape, self.expectations.values()))
+        # p_dim = set(map(np.shape, self.params.values()))
+        e_dim = set(map(np.shape, self.expectations.values()))
         # assert len(p_dim) == 1, "Parameters have different dimensionalities"
         assert len(e_dim) == 1, "Expectations have different dimensionalities"
         # assert e_dim == p_dim, "Parameters and Expectations have different dimensionality"
@@ -75,9 +75,9 @@ class Distribution(object):
             indices of the elements to remove
         """
         assert axis <= len(self.dim)
-        assert s.all(idx < self.dim[axis])
-        for k in self.params.keys(): self.params[k] = s.delete(self.params[k], idx, axis)
-        for k in self.expectations.keys(): self.expectations[k] = s.delete(self.expectations[k], idx, axis)
+        assert np.all(idx < self.dim[axis])
+        for k in self.params.keys(): self.params[k] = np.delete(self.params[k], idx, axis)
+        for k in self.expectations.keys(): self.expectations[k] = np.delete(self.expectations[k], idx, axis)
         self.updateDim(axis=axis, new_dim=self.dim[axis]-len(idx))
 
     def updateDim(self, axis, new_dim):
@@ -126,14 +126,14 @@ class MultivariateGaussian(Distribution):
 
         # Initialise the mean
         # If 'mean' is a scalar, broadcast it to all dimensions
-        if isinstance(mean,(int,float)): mean = s.ones( (dim[0],dim[1]) ) * mean
+        if isinstance(mean,(int,float)): mean = np.ones( (dim[0],dim[1]) ) * mean
         # If 'mean' has dim (D,) and we have N distributions, broadcast it to all N distributions
-        if len(mean.shape)==1 and mean.shape[0]==dim[1]: mean = s.repeat(mean,dim[0],0)
+        if len(mean.shape)==1 and mean.shape[0]==dim[1]: mean = np.repeat(mean,dim[0],0)
         assert sum(mean.shape) > 2, "The mean has to be a matrix with shape (N,D) "
 
         # Initialise the covariance
         # If 'cov' is a matrix and not a tensor, broadcast it along the zeroth axis
-        if len(cov.shape) == 2: cov = s.repeat(cov[None,:,:],dim[0],0)
+        if len(cov.shape) == 2: cov = np.repeat(cov[None,:,:],dim[0],0)
         assert (cov.shape[1]==cov.shape[2]) and (sum(cov.shape[1:])>1), "The covariance has to be a tensor with shape (N,D,D)"
 
         # Check that the dimensionalities of 'mean' and 'cov' match
@@ -153,48 +153,51 @@ class MultivariateGaussian(Distribution):
         # Update first and second moments using current parameters
         E = self.params['mean']
 
-        # self.E2 = s.empty( (self.dim[0],self.dim[1],self.dim[1]) )
+        # self.E2 = np.empty( (self.dim[0],self.dim[1],self.dim[1]) )
         # for i in range(self.dim[0]):
-        #     self.E2[i,:,:] = s.outer(self.E[i,:],self.E[i,:]) + self.cov[i,:,:]
+        #     self.E2[i,:,:] = np.outer(self.E[i,:],self.E[i,:]) + self.cov[i,:,:]
 
         E2 = self.params['cov'].copy()
         for i in range(self.dim[0]):
-            E2[i,:,:] += s.outer(E[i,:],E[i,:])
+            E2[i,:,:] += np.outer(E[i,:],E[i,:])
 
         self.expectations = {'E':E, 'E2':E2}
 
     def density(self, x):
         assert x.shape == self.dim, "Problem with the dimensionalities"
-        return s.sum( stats.multivariate_normal.pdf(x, mean=self.params['mean'][n,:], cov=self.params['cov'][n,:,:]) )
+        return np.sum( stats.multivariate_normal.pdf(x, mean=self.params['mean'][n,:], cov=self.params['cov'][n,:,:]) )
 
     def loglik(self, x):
         assert x.shape == self.dim, "Problem with the dimensionalities"
         l = 0.
         D = self.dim[1]
         for n in range(self.dim[0]):
-            qterm = (x[n,:]-self.params['mean'][n,:]).T.dot(linalg.det(self.params['cov'][n,:,:])).dot(x[n,:]-self.params['mean'][n,:])
-            l += -0.5*D*s.log(2*s.pi) - 0.5*s.log(linalg.det(self.params['cov'][n,:,:])) -0.5*qterm
+            # The Cholesky factor gives both the quadratic form (by triangular solves) and the log-determinant
+            c, low = linalg.cho_factor(self.params['cov'][n,:,:])
+            xc = x[n,:]-self.params['mean'][n,:]
+            qterm = xc.dot(linalg.cho_solve((c,low), xc))
+            l += -0.5*D*np.log(2*np.pi) - np.log(np.diag(c)).sum() -0.5*qterm
         return l
-        # return s.sum( s.log(stats.multivariate_normal.pdf(x, mean=self.mean[n,:], cov=self.cov[n,:,:])) )
+        # return np.sum( np.log(stats.multivariate_normal.pdf(x, mean=self.mean[n,:], cov=self.cov[n,:,:])) )
 
     def removeDimensions(self, axis, idx):
         # Method to remove undesired dimensions
         # - axis (int): axis from where to remove the elements
         # - idx (numpy array): indices of the elements to remove
         assert axis <= len(self.dim)
-        assert s.all(idx < self.dim[axis])
-        self.params["mean"] = s.delete(self.params["mean"], axis=1, obj=idx)
-        self.params["cov"] = s.delete(self.params["cov"], axis=1, obj=idx)
-        self.params["cov"] = s.delete(self.params["cov"], axis=2, obj=idx)
-        self.expectations["E"] = s.delete(self.expectations["E"], axis=1, obj=idx)
-        self.expectations["E2"] = s.delete(self.expectations["E2"], axis=1, obj=idx)
-        self.expectations["E2"] = s.delete(self.expectations["E2"], axis=2, obj=idx)
+        assert np.all(idx < self.dim[axis])
+        self.params["mean"] = np.delete(self.params["mean"], axis=1, obj=idx)
+        self.params["cov"] = np.delete(self.params["cov"], axis=1, obj=idx)
+        self.params["cov"] = np.delete(self.params["cov"], axis=2, obj=idx)
+        self.expectations["E"] = np.delete(self.expectations["E"], axis=1, obj=idx)
+        self.expectations["E2"] = np.delete(self.expectations["E2"], axis=1, obj=idx)
+        self.expectations["E2"] = np.delete(self.expectations["E2"], axis=2, obj=idx)
         self.dim = (self.dim[0],self.dim[1]-len(idx))
 
     # def entropy(self):
         # CHECK THIs Is CORRECT
         # tmp = sum( [ logdet(self.cov[i,:,:]) for i in range(self.dim[0]) ] )
-        # return ( 0.5*(tmp + (self.dim[0]*self.dim[1])*(1+s.log(2*pi)) ).sum() )
+        # return ( 0.5*(tmp + (self.dim[0]*self.dim[1])*(1+np.log(2*pi)) ).sum() )
 class UnivariateGaussian(Distribution):
     """
     Class to define univariate Gaussian distributions
@@ -212,8 +215,8 @@ class UnivariateGaussian(Distribution):
         Distribution.__init__(self, dim)
 
         # Initialise parameters
-        mean = s.ones(dim) * mean
-        var = s.ones(dim) * var
+        mean = np.ones(dim) * mean
+        var = np.ones(dim) * var
         self.params = { 'mean':mean, 'var':var }
 
         # Initialise expectations 
@@ -221,10 +224,10 @@ class UnivariateGaussian(Distribution):
         if E is None:
             self.updateExpectations()
         else:
-            self.expectations['E'] = s.ones(dim)*E 
+            self.expectations['E'] = np.ones(dim)*E 
 
         if E2 is not None:
-            self.expectations['E2'] = s.ones(dim)*E2 
+            self.expectations['E2'] = np.ones(dim)*E2 
 
 
         # Check that dimensionalities match
@@ -239,16 +242,16 @@ class UnivariateGaussian(Distribution):
 
     def density(self, x):
         assert x.shape == self.dim, "Problem with the dimensionalities"
-        # print stats.norm.pdf(x, loc=self.mean, scale=s.sqrt(self.var))
-        return s.sum( (1/s.sqrt(2*s.pi*self.params['var'])) * s.exp(-0.5*(x-self.params['mean'])**2/self.params['var']) )
+        # print stats.norm.pdf(x, loc=self.mean, scale=np.sqrt(self.var))
+        return np.sum( (1/np.sqrt(2*np.pi*self.params['var'])) * np.exp(-0.5*(x-self.params['mean'])**2/self.params['var']) )
 
     def loglik(self, x):
         assert x.shape == self.dim, "Problem with the dimensionalities"
-        # return s.log(stats.norm.pdf(x, loc=self.mean, scale=s.sqrt(self.var)))
-        return s.sum( -0.5*s.log(2*s.pi) - 0.5*s.log(self.params['var']) -0.5*(x-self.params['mean'])**2/self.params['var'] )
+        # return np.log(stats.norm.pdf(x, loc=self.mean, scale=np.sqrt(self.var)))
+        return np.sum( -0.5*np.log(2*np.pi) - 0.5*np.log(self.params['var']) -0.5*(x-self.params['mean'])**2/self.params['var'] )
 
     def entropy(self):
-        return s.sum( 0.5*s.log(self.params['var']) + 0.5*(1+s.log(2*s.pi)) )
+        return np.sum( 0.5*np.log(self.params['var']) + 0.5*(1+np.log(2*np.pi)) )
 class Gamma(Distribution):
     """
     Class to define Gamma distributions
@@ -266,31 +269,31 @@ class Gamma(Distribution):
         Distribution.__init__(self, dim)
 
         # Initialise parameters
-        a = s.ones(dim) * a
-        b = s.ones(dim) * b
+        a = np.ones(dim) * a
+        b = np.ones(dim) * b
         self.params = { 'a':a, 'b':b }
 
         # Initialise expectations
         if E is None:
             self.updateExpectations()
         else:
-            self.expectations = { 'E':s.ones(dim)*E, 'lnE':s.log(s.ones(dim)*E) }
+            self.expectations = { 'E':np.ones(dim)*E, 'lnE':np.log(np.ones(dim)*E) }
 
         # Check that dimensionalities match
         self.CheckDimensionalities()
 
     def updateExpectations(self):
         E = self.params['a']/self.params['b']
-        lnE = special.digamma(self.params['a']) - s.log(self.params['b'])
+        lnE = special.digamma(self.params['a']) - np.log(self.params['b'])
         self.expectations = { 'E':E, 'lnE':lnE }
 
     def density(self, x):
         assert x.shape == self.dim, "Problem with the dimensionalities"
-        return s.prod( (1/special.gamma(self.params['a'])) * self.params['b']**self.params['a'] * x**(self.params['a']-1) * s.exp(-self.params['b']*x) )
+        return np.prod( (1/special.gamma(self.params['a'])) * self.params['b']**self.params['a'] * x**(self.params['a']-1) * np.exp(-self.params['b']*x) )
 
     def loglik(self, x):
         assert x.shape == self.dim, "Problem with the dimensionalities"
-        return s.sum( -s.log(special.gamma(self.params['a'])) + self.params['a']*s.log(self.params['b']) * (self.params['a']-1)*s.log(x) -self.params['b']*x )
+        return np.sum( -np.log(special.gamma(self.params['a'])) + self.params['a']*np.log(self.params['b']) * (self.params['a']-1)*np.log(x) -self.params['b']*x )
 class Poisson(Distribution):
     """
     Class to define Poisson distributions.
@@ -306,14 +309,14 @@ class Poisson(Distribution):
         Distribution.__init__(self, dim)
 
         # Initialise parameters
-        theta = s.ones(dim) * theta
+        theta = np.ones(dim) * theta
         self.params = { 'theta':theta }
 
         # Initialise expectations
         if E is None:
             self.updateExpectations()
         else:
-            self.expectations = { 'E':s.ones(dim)*E }
+            self.expectations = { 'E':np.ones(dim)*E }
 
         # Check that dimensionalities match
         self.CheckDimensionalities()
@@ -327,16 +330,16 @@ class Poisson(Distribution):
         assert x.dtype == int, "x has to be an integer array"
         theta = self.params['theta'].flatten()
         x = x.flatten()
-        # return s.prod (stats.poisson.pmf(x,theta) )
-        return s.prod( s.divide(theta**x * s.exp(-theta),s.misc.factorial(x)) )
+        # return np.prod (stats.poisson.pmf(x,theta) )
+        return np.prod( np.divide(theta**x * np.exp(-theta),special.factorial(x)) )
 
     def loglik(self, x):
         assert x.shape == self.dim, "Problem with the dimensionalities"
         assert x.dtype == int, "x has to be an integer array"
         theta = self.params['theta'].flatten()
         x = x.flatten()
-        # return s.log( s.prod (stats.poisson.pmf(x,theta) ))
-        return s.sum( x*s.log(theta) - theta - s.log(s.misc.factorial(x)) )
+        # return np.log( np.prod (stats.poisson.pmf(x,theta) ))
+        return np.sum( x*np.log(theta) - theta - np.log(special.factorial(x)) )
 class Bernoulli(Distribution):
     """
     Class to define Bernoulli distributions
@@ -348,14 +351,14 @@ class Bernoulli(Distribution):
         Distribution.__init__(self, dim)
 
         # Initialise parameters
-        theta = s.ones(dim) * theta
+        theta = np.ones(dim) * theta
         self.params = { 'theta':theta }
 
         # Initialise expectations
         if E is None:
             self.updateExpectations()
         else:
-            self.expectations = { 'E':s.ones(dim)*E }
+            self.expectations = { 'E':np.ones(dim)*E }
 
         # Check that dimensionalities match
         self.CheckDimensionalities()
@@ -366,11 +369,11 @@ class Bernoulli(Distribution):
 
     def density(self, x):
         assert x.shape == self.dim, "Problem with the dimensionalities"
-        return s.prod( self.params['theta']**x * (1-self.params['theta'])**(1-x) )
+        return np.prod( self.params['theta']**x * (1-self.params['theta'])**(1-x) )
 
     def loglik(self, x):
         assert x.shape == self.dim, "Problem with the dimensionalities"
-        return s.sum( x*self.params['theta'] + (1-x)*(1-self.params['theta']) )
+        return np.sum( x*self.params['theta'] + (1-x)*(1-self.params['theta']) )
 class BernoulliGaussian(Distribution):
     """
     Class to define a Bernoulli-Gaussian distributions (for more information see Titsias and Gredilla, 2014)
@@ -424,9 +427,9 @@ class BernoulliGaussian(Distribution):
         ES = self.S.getExpectation()
         EW = self.W_S1.getExpectation()
         E = ES * EW
-        ESWW = ES * (s.square(EW) + self.params["var_S1"])
+        ESWW = ES * (np.square(EW) + self.params["var_S1"])
         # ESWW = self.params["theta"] * (self.params["mean_S1"]**2 + self.params["var_S1"])
-        EWW = ES*(s.square(EW)+self.params["var_S1"]) + (1-ES)*self.params["var_S0"]
+        EWW = ES*(np.square(EW)+self.params["var_S1"]) + (1-ES)*self.params["var_S0"]
         # EWW = self.params["theta"]*(self.params["mean_S1"]**2+self.params["var_S1"]) + (1-self.params["theta"])*self.params["var_S0"]
 
         # Collect expectations
@@ -437,7 +440,7 @@ class BernoulliGaussian(Distribution):
         # - axis (int): axis from where to remove the elements
         # - idx (numpy array): indices of the elements to remove
         assert axis <= len(self.dim)
-        assert s.all(idx < self.dim[axis])
+        assert np.all(idx < self.dim[axis])
         self.S.removeDimensions(axis,idx)
         self.W_S0.removeDimensions(axis,idx)
         self.W_S1.removeDimensions(axis,idx)
@@ -466,15 +469,15 @@ class Binomial(Distribution):
         Distribution.__init__(self, dim)
 
         # Initialise parameters
-        theta = s.ones(dim)*theta
-        N = s.ones(dim)*N
+        theta = np.ones(dim)*theta
+        N = np.ones(dim)*N
         self.params = { 'theta':theta, 'N':N }
 
         # Initialise expectations 
         if E is None:
             self.updateExpectations()
         else:
-            E = s.ones(dim)*E
+            E = np.ones(dim)*E
             self.expectations = { 'E':E }
 
         # Check that dimensionalities match
@@ -487,14 +490,14 @@ class Binomial(Distribution):
     def density(self, x):
         assert x.shape == self.dim, "Problem with the dimensionalities"
         assert x.dtype == int, "x has to be an integer array"
-        # return s.prod( stats.binom.pmf(x, self.params["N"], self.theta) )
-        return s.prod( special.binom(self.params["N"],x) * self.params["theta"]**x * (1-self.params["theta"])**(self.params["N"]-x) )
+        # return np.prod( stats.binom.pmf(x, self.params["N"], self.theta) )
+        return np.prod( special.binom(self.params["N"],x) * self.params["theta"]**x * (1-self.params["theta"])**(self.params["N"]-x) )
 
     def loglik(self, x):
         assert x.shape == self.dim, "Problem with the dimensionalities"
         assert x.dtype == int, "x has to be an integer array"
-        # print s.sum (stats.binom.logpmf(x, self.params["N"], self.theta) )
-        return s.sum( s.log(special.binom(self.params["N"],x)) + x*s.log(self.params["theta"]) + (self.params["N"]-x)*s.log(1-self.params["theta"]) )
+        # print np.sum (stats.binom.logpmf(x, self.params["N"], self.theta) )
+        return np.sum( np.log(special.binom(self.params["N"],x)) + x*np.log(self.params["theta"]) + (self.params["N"]-x)*np.log(1-self.params["theta"]) )
 class Beta(Distribution):
     """
     Class to define Beta distributions
@@ -509,8 +512,8 @@ class Beta(Distribution):
         Distribution.__init__(self, dim)
 
         # Initialise parameters
-        a = s.ones(dim)*a
-        b = s.ones(dim)*b
+        a = np.ones(dim)*a
+        b = np.ones(dim)*b
         self.params = { 'a':a, 'b':b }
 
         # Initialise expectations
@@ -518,25 +521,25 @@ class Beta(Distribution):
             self.updateExpectations()
         else:
             self.expectations = { 
-            'E':s.ones(dim)*E,
-            'lnE':s.log(s.ones(dim)*E),
-            'lnEInv':s.log(1.-s.ones(dim)*E)
+            'E':np.ones(dim)*E,
+            'lnE':np.log(np.ones(dim)*E),
+            'lnEInv':np.log(1.-np.ones(dim)*E)
             }
-            self.expectations["lnEInv"][s.isinf(self.expectations["lnEInv"])] = -s.inf
+            self.expectations["lnEInv"][np.isinf(self.expectations["lnEInv"])] = -np.inf
 
         # Check that dimensionalities match
         self.CheckDimensionalities()
 
     def updateExpectations(self):
         a, b = self.params['a'], self.params['b']
-        E = s.divide(a,a+b)
+        E = np.divide(a,a+b)
         lnE = special.digamma(a) - special.digamma(a+b)
         lnEInv = special.digamma(b) - special.digamma(a+b) # expectation of ln(1-X)
-        lnEInv[s.isinf(lnEInv)] = -s.inf # there is a numerical error in lnEInv if E=1
+        lnEInv[np.isinf(lnEInv)] = -np.inf # there is a numerical error in lnEInv if E=1
         self.expectations = { 'E':E, 'lnE':lnE, 'lnEInv':lnEInv }
 
 # if __name__ == "__main__":
 #     a = Beta(dim=(10,20), a=1, b=1, E=3)
-#     MultivariateGaussian(dim=(1,10), mean=stats.norm.rvs(loc=0, scale=1, size=(10,)), cov=s.eye(10,10), E=None)
+#     MultivariateGaussian(dim=(1,10), mean=stats.norm.rvs(loc=0, scale=1, size=(10,)), cov=np.eye(10,10), E=None)
 #     exit()
 
@@ -1,6 +1,6 @@
 import argparse
 import pandas as pd
-import scipy as s
+import numpy as np
 import sys
 from time import sleep
 
@@ -73,7 +73,7 @@ class entry_point():
       sys.stdout.flush()
       exit()
 
-    assert s.all([ isinstance(data[m],s.ndarray) or isinstance(data[m],pd.DataFrame) for m in range(len(data)) ]), "Error, input data is not a numpy.ndarray"
+    assert np.all([ isinstance(data[m],np.ndarray) or isinstance(data[m],pd.DataFrame) for m in range(len(data)) ]), "Error, input data is not a numpy.ndarray"
 
     # Verbose message
     for m in range(len(data)):
@@ -101,7 +101,7 @@ class entry_point():
       self.dimensionalities["N"] = self.parsed_data[0].shape[0] # Update dimensionalities
 
   def set_train_options(self, iter=5000, elbofreq=1, startSparsity=100, tolerance=0.01, 
-    startDrop=5, freqDrop=1, endDrop=9999, dropR2=0, nostop=False, verbose=False, seed=None
+    startDrop=5, freqDrop=1, endDrop=9999, dropR2=0, nostop=False, verbose=False, seed=None, cores=1, patience=5
     ):
     """ Set training options """
 
@@ -129,6 +129,9 @@ class entry_point():
     # Do no stop even when convergence criteria is met
     self.train_opts['forceiter'] = nostop
 
+    # Number of consecutive ELBO evaluations changing less than the tolerance (in either direction) after which the model is considered converged
+    self.train_opts['patience'] = int(patience)
+
     # Iteration to activate spike and slab sparsity
     self.train_opts['startSparsity'] = int(startSparsity)
     if hasattr(self, 'model_opts'):
@@ -137,6 +140,11 @@ class entry_point():
     # Define schedule of updates
     self.train_opts['schedule'] = ( "Y", "SW", "Z", "Alpha", "Theta", "Tau" )
 
+    # Number of threads used to update the views of the multi-view nodes in parallel
+    # Note that these threads compete for the same cores as the threads of NumPy's BLAS library,
+    # so on multi-core machines it may be necessary to limit the latter (e.g. OMP_NUM_THREADS)
+    self.train_opts['cores'] = int(cores)
+
     # Seed
     if seed is None:
       seed = 0
@@ -178,11 +186,11 @@ class entry_point():
     # Define whether to use spike and slab sparsity or not
     if sparsity:
       self.model_opts['sparsity_bool'] = True
-      self.model_opts['sparsity'] = [s.ones(K) for m in range(M)]
+      self.model_opts['sparsity'] = [np.ones(K) for m in range(M)]
     else:
       self.model_opts['sparsity_bool'] = False
       print("\nWarning... sparsity is desactivated, we recommend using it\n")
-      self.model_opts['sparsity'] = [s.zeros(K) for m in range(M)]
+      self.model_opts['sparsity'] = [np.zeros(K) for m in range(M)]
       if hasattr(self, 'train_opts'): self.train_opts['startSparsity'] = 999999999
 
   def set_data_options(self, view_names=None, center_features=True, scale_features=False, scale_views=False, 
@@ -266,25 +274,25 @@ class entry_point():
     D = self.dimensionalities["D"]
     
     # Latent Variables
-    self.model_opts["priorZ"] = { 'mean':s.zeros((N,K)) }
-    self.model_opts["priorZ"]['var'] = s.ones((K,))*1.
+    self.model_opts["priorZ"] = { 'mean':np.zeros((N,K)) }
+    self.model_opts["priorZ"]['var'] = np.ones((K,))*1.
 
     # Weights
-    self.model_opts["priorSW"] = { 'Theta':[s.nan]*M, 'mean_S0':[s.nan]*M, 'var_S0':[s.nan]*M, 'mean_S1':[s.nan]*M, 'var_S1':[s.nan]*M } # Not required
-    # self.model_opts["priorAlpha"] = { 'a':[s.ones(K)*1e-14]*M, 'b':[s.ones(K)*1e-14]*M }
-    self.model_opts["priorAlpha"] = { 'a':[s.ones(K)*1e-5]*M, 'b':[s.ones(K)*1e-5]*M }
+    self.model_opts["priorSW"] = { 'Theta':[np.nan]*M, 'mean_S0':[np.nan]*M, 'var_S0':[np.nan]*M, 'mean_S1':[np.nan]*M, 'var_S1':[np.nan]*M } # Not required
+    # self.model_opts["priorAlpha"] = { 'a':[np.ones(K)*1e-14]*M, 'b':[np.ones(K)*1e-14]*M }
+    # Read-only priors are broadcasted views, the nodes copy them when they are initialised
+    self.model_opts["priorAlpha"] = { 'a':[np.broadcast_to(1e-5,(K,))]*M, 'b':[np.broadcast_to(1e-5,(K,))]*M }
 
     # Theta
-    self.model_opts["priorTheta"] = { 'a':[s.ones(K,) for m in range(M)], 'b':[s.ones(K,) for m in range(M)] }
+    self.model_opts["priorTheta"] = { 'a':[np.ones(K,) for m in range(M)], 'b':[np.ones(K,) for m in range(M)] }
     for m in range(M):
-      for k in range(K):
-        if self.model_opts['sparsity'][m][k]==0:
-          self.model_opts["priorTheta"]["a"][m][k] = s.nan
-          self.model_opts["priorTheta"]["b"][m][k] = s.nan
+      nosparsity = self.model_opts['sparsity'][m]==0
+      self.model_opts["priorTheta"]["a"][m][nosparsity] = np.nan
+      self.model_opts["priorTheta"]["b"][m][nosparsity] = np.nan
 
     # Tau
-    # self.model_opts["priorTau"] = { 'a':[s.ones(D[m])*1e-14 for m in range(M)], 'b':[s.ones(D[m])*1e-14 for m in range(M)] }
-    self.model_opts["priorTau"] = { 'a':[s.ones(D[m])*1e-5 for m in range(M)], 'b':[s.ones(D[m])*1e-5 for m in range(M)] }
+    # self.model_opts["priorTau"] = { 'a':[np.ones(D[m])*1e-14 for m in range(M)], 'b':[np.ones(D[m])*1e-14 for m in range(M)] }
+    self.model_opts["priorTau"] = { 'a':[np.broadcast_to(1e-5,(D[m],)) for m in range(M)], 'b':[np.broadcast_to(1e-5,(D[m],)) for m in range(M)] }
 
   def define_init(self, initTheta=1.):
     """ Define Initialisations of the model
@@ -301,36 +309,35 @@ class entry_point():
     D = self.dimensionalities["D"]
 
     # Latent variables
-    self.model_opts["initZ"] = { 'mean':"random", 'var':s.ones((K,)), 'E':None, 'E2':None }
+    self.model_opts["initZ"] = { 'mean':"random", 'var':np.ones((K,)), 'E':None, 'E2':None }
 
     # Tau
-    self.model_opts["initTau"] = { 'a':[s.nan]*M, 'b':[s.nan]*M, 'E':[s.ones(D[m])*100 for m in range(M)] }
+    self.model_opts["initTau"] = { 'a':[np.nan]*M, 'b':[np.nan]*M, 'E':[np.broadcast_to(100.,(D[m],)) for m in range(M)] }
 
     # ARD of weights
-    self.model_opts["initAlpha"] = { 'a':[s.nan]*M, 'b':[s.nan]*M, 'E':[s.ones(K)*1. for m in range(M)] }
+    self.model_opts["initAlpha"] = { 'a':[np.nan]*M, 'b':[np.nan]*M, 'E':[np.broadcast_to(1.,(K,))]*M }
 
     # Theta
-    self.model_opts["initTheta"] = { 'a':[s.ones(K,) for m in range(M)], 'b':[s.ones(K,) for m in range(M)], 'E':[s.nan*s.zeros(K,) for m in range(M)] }
+    self.model_opts["initTheta"] = { 'a':[np.ones(K,) for m in range(M)], 'b':[np.ones(K,) for m in range(M)], 'E':[np.nan*np.zeros(K,) for m in range(M)] }
     if type(initTheta) is float:
-      self.model_opts['initTheta']['E'] = [s.ones(K,)*initTheta for m in range(M)]
+      self.model_opts['initTheta']['E'] = [np.ones(K,)*initTheta for m in range(M)]
     else:
        print("Error: 'initTheta' must be a float")
        exit()
 
     for m in range(M):
-      for k in range(K):
-        if self.model_opts['sparsity'][m][k]==0.:
-          self.model_opts["initTheta"]["a"][m][k] = s.nan
-          self.model_opts["initTheta"]["b"][m][k] = s.nan
+      nosparsity = self.model_opts['sparsity'][m]==0.
+      self.model_opts["initTheta"]["a"][m][nosparsity] = np.nan
+      self.model_opts["initTheta"]["b"][m][nosparsity] = np.nan
 
     # Weights
     self.model_opts["initSW"] = { 
-      'Theta':[ s.repeat(self.model_opts['initTheta']['E'][m][None,:],self.dimensionalities["D"][m],0) for m in range(M)],
-      'mean_S0':[s.zeros((D[m],K)) for m in range(M)],
-      'var_S0':[s.nan*s.ones((D[m],K)) for m in range(M)],
-      'mean_S1':[s.zeros((D[m],K)) for m in range(M)],
+      'Theta':[ np.repeat(self.model_opts['initTheta']['E'][m][None,:],self.dimensionalities["D"][m],0) for m in range(M)],
+      'mean_S0':[np.zeros((D[m],K)) for m in range(M)],
+      'var_S0':[np.nan*np.ones((D[m],K)) for m in range(M)],
+      'mean_S1':[np.zeros((D[m],K)) for m in range(M)],
       # 'mean_S1':[stats.norm.rvs(loc=0, scale=1, size=(D[m],K)) for m in range(M)],
-      'var_S1':[s.ones((D[m],K)) for m in range(M)],
+      'var_S1':[np.ones((D[m],K)) for m in range(M)],
       'ES':[None]*M, 'EW_S0':[None]*M, 'EW_S1':[None]*M # It will be calculated from the parameters
     }
 
@@ -347,8 +354,8 @@ class entry_point():
     idx = range(self.data_opts['covariates'].shape[1])
 
     # Ignore mean and variance in the prior distribution of Z
-    # self.model_opts["priorZ"]["mean"][idx] = s.nan
-    self.model_opts["priorZ"]["var"][idx] = s.nan
+    # self.model_opts["priorZ"]["mean"][idx] = np.nan
+    self.model_opts["priorZ"]["var"][idx] = np.nan
 
     # Ignore variance in the variational distribution of Z
     # The mean has been initialised to the covariate values
@@ -367,10 +374,10 @@ class entry_point():
     # If we want to learn the intercept, we add a constant covariate of 1s
     if self.model_opts['learnIntercept']:
       if self.data_opts['covariates'] is not None:
-        self.data_opts['covariates'] = s.insert(self.data_opts['covariates'], obj=0, values=1., axis=1)
+        self.data_opts['covariates'] = np.insert(self.data_opts['covariates'], obj=0, values=1., axis=1)
         self.data_opts['scale_covariates'].insert(0,False)
       else:
-        self.data_opts['covariates'] = s.ones((N,1))
+        self.data_opts['covariates'] = np.ones((N,1))
         self.data_opts['scale_covariates'] = [False]
 
       # Parse intercept
@@ -386,16 +393,16 @@ class entry_point():
 
         # Weights
         # if self.model_opts["likelihoods"][m]=="gaussian":
-        self.model_opts["initSW"]["mean_S1"][m][:,0] = s.nanmean(self.parsed_data[m], axis=0)
+        self.model_opts["initSW"]["mean_S1"][m][:,0] = np.nanmean(self.parsed_data[m], axis=0)
         self.model_opts["initSW"]["var_S1"][m][:,0] = 1e-10
 
         # Theta
         self.model_opts['sparsity'][m][0] = 0.
         self.model_opts["initSW"]["Theta"][m][:,0] = 1.
-        self.model_opts["priorTheta"]['a'][m][0] = s.nan
-        self.model_opts["priorTheta"]['b'][m][0] = s.nan
-        self.model_opts["initTheta"]["a"][m][0] = s.nan
-        self.model_opts["initTheta"]["b"][m][0] = s.nan
+        self.model_opts["priorTheta"]['a'][m][0] = np.nan
+        self.model_opts["priorTheta"]['b'][m][0] = np.nan
+        self.model_opts["initTheta"]["a"][m][0] = np.nan
+        self.model_opts["initTheta"]["b"][m][0] = np.nan
         self.model_opts["initTheta"]["E"][m][0] = 1.
 
   def train_model(self):
@@ -3,8 +3,7 @@
 Module to initalise the nodes
 """
 
-import scipy as s
-import scipy.stats as stats
+import numpy as np
 from sys import path
 import sklearn.decomposition
 
@@ -26,7 +25,13 @@ class initModel(object):
          lik: list of strings 
             likelihood for each view
         """
-        self.data = data
+        # The data may come in column-major order (e.g. transposed or from R), store it in row-major
+        # order so that the products and reductions of the updates work on contiguous memory.
+        # ndarray.copy keeps subclasses, so the mask of masked arrays is preserved
+        self.data = [None]*len(data)
+        for m in range(len(data)):
+            Y = data[m] if isinstance(data[m],np.ndarray) else np.asarray(data[m]) # e.g. pandas data frames
+            self.data[m] = Y if Y.flags['C_CONTIGUOUS'] else Y.copy(order='C')
         self.lik = lik
         self.N = dim["N"]
         self.K = dim["K"]
@@ -36,7 +41,7 @@ class initModel(object):
         self.nodes = {}
 
         # Set the seed
-        s.random.seed(seed)
+        np.random.seed(seed)
 
     def initZ(self, pmean, pvar, qmean, qvar, qE=None, qE2=None, covariates=None, scale_covariates=None):
         """Method to initialise the latent variables
@@ -58,23 +63,23 @@ class initModel(object):
         if qmean is not None:
             if isinstance(qmean,str):
                 if qmean == "random": # Random initialisation of latent variables
-                    qmean = stats.norm.rvs(loc=0, scale=1, size=(self.N,self.K))
+                    qmean = np.random.standard_normal((self.N,self.K))
 
                 elif qmean == "orthogonal": # Latent variables are initialised randomly but ensuring orthogonality
                     pca = sklearn.decomposition.PCA(n_components=self.K, copy=True, whiten=True)
-                    pca.fit(stats.norm.rvs(loc=0, scale=1, size=(self.N,9999)).T)
+                    pca.fit(np.random.standard_normal((self.N,9999)).T)
                     qmean = pca.components_.T
 
                 elif qmean == "pca": # Latent variables are initialised from PCA in the concatenated matrix
                     pca = sklearn.decomposition.PCA(n_components=self.K, copy=True, whiten=True)
-                    pca.fit(s.concatenate(self.data,axis=1).T)
+                    pca.fit(np.concatenate(self.data,axis=1).T)
                     qmean = pca.components_.T
 
-            elif isinstance(qmean,s.ndarray):
+            elif isinstance(qmean,np.ndarray):
                 assert qmean.shape == (self.N,self.K)
 
             elif isinstance(qmean,(int,float)):
-                qmean = s.ones((self.N,self.K)) * qmean
+                qmean = np.ones((self.N,self.K)) * qmean
 
             else:
                 print("Wrong initialisation for Z")
@@ -85,16 +90,16 @@ class initModel(object):
             assert scale_covariates != None, "If you use covariates also define data_opts['scale_covariates']"
 
             # Select indices for covaraites
-            idx_covariates = s.array(range(covariates.shape[1]))
+            idx_covariates = np.array(range(covariates.shape[1]))
 
             # Center and scale the covariates to match the prior distribution N(0,1)
             # to-do: this needs to be improved to take the particular mean and var into account
             # covariates[scale_covariates] = (covariates - covariates.mean(axis=0)) / covariates.std(axis=0)
-            scale_covariates = s.array(scale_covariates)
-            covariates[:,scale_covariates] = (covariates[:,scale_covariates] - s.nanmean(covariates[:,scale_covariates], axis=0)) / s.nanstd(covariates[:,scale_covariates], axis=0)
+            scale_covariates = np.array(scale_covariates)
+            covariates[:,scale_covariates] = (covariates[:,scale_covariates] - np.nanmean(covariates[:,scale_covariates], axis=0)) / np.nanstd(covariates[:,scale_covariates], axis=0)
 
             # Set to zero the missing values in the covariates
-            covariates[s.isnan(covariates)] = 0.
+            covariates[np.isnan(covariates)] = 0.
             qmean[:,idx_covariates] = covariates
         else:
             idx_covariates = None
@@ -103,10 +108,10 @@ class initModel(object):
         # Initialise the node
         # self.Z = Constant_Node(dim=(self.N,self.K), value=qmean)
         self.Z = Z_Node(dim=(self.N,self.K),
-                        pmean=s.ones((self.N,self.K))*pmean,
-                        pvar=s.ones((self.K,))*pvar,
-                        qmean=s.ones((self.N,self.K))*qmean,
-                        qvar=s.ones((self.N,self.K))*qvar,
+                        pmean=np.ones((self.N,self.K))*pmean,
+                        pvar=np.ones((self.K,))*pvar,
+                        qmean=np.ones((self.N,self.K))*qmean,
+                        qvar=np.ones((self.N,self.K))*qvar,
                         qE=qE, 
                         qE2=qE2,
                         idx_covariates=idx_covariates)
@@ -124,14 +129,14 @@ class initModel(object):
            # Initialise first moment
             if isinstance(qmean_S1[m],str):
                 if qmean_S1[m] == "random":
-                    qmean_S1[m] = stats.norm.rvs(loc=0, scale=1, size=(self.D[m],self.K))
+                    qmean_S1[m] = np.random.standard_normal((self.D[m],self.K))
                 else:
                     print("%s initialisation not implemented for SW" % qmean_S1[m])
                     exit()
-            elif isinstance(qmean_S1[m],s.ndarray):
+            elif isinstance(qmean_S1[m],np.ndarray):
                 assert qmean_S1[m].shape == (self.D[m],self.K), "Wrong dimensionality"
             elif isinstance(qmean_S1[m],(int,float)):
-                qmean_S1[m] = s.ones((self.D[m],self.K)) * qmean_S1[m]
+                qmean_S1[m] = np.ones((self.D[m],self.K)) * qmean_S1[m]
             else:
                 print("Wrong initialisation for SW")
                 exit()
@@ -190,8 +195,8 @@ class initModel(object):
         tau_list = [None]*self.M
         for m in range(self.M):
             if self.lik[m] == "poisson":
-                tmp = 0.25 + 0.17*s.nanmax(self.data[m],axis=0)
-                tau_list[m] = Constant_Node(dim=((self.N,self.D[m])), value=s.repeat(tmp[None,:],self.N,0))
+                tmp = 0.25 + 0.17*np.nanmax(self.data[m],axis=0)
+                tau_list[m] = Constant_Node(dim=((self.N,self.D[m])), value=np.repeat(tmp[None,:],self.N,0))
 
             elif self.lik[m] == "bernoulli":
                 # seeger
@@ -200,7 +205,7 @@ class initModel(object):
                 tau_list[m] = Tau_Jaakkola(dim=((self.N,self.D[m])), value=1.)
             elif self.lik[m] == "binomial":
                 print("Not implemented")
-                # tmp = 0.25*s.amax(self.data["tot"][m],axis=0)
+                # tmp = 0.25*np.amax(self.data["tot"][m],axis=0)
                 # tau_list[m] = Constant_Node(dim=(self.D[m],), value=tmp)
             elif self.lik[m] == "gaussian":
                 tau_list[m] = Tau_Node(dim=(self.D[m],), pa=pa[m], pb=pb[m], qa=qa[m], qb=qb[m], qE=qE[m])
@@ -241,8 +246,8 @@ class initModel(object):
             if Kconst.sum() == 0:
                 ConstThetaNode = None
             else:
-                # ConstThetaNode = Theta_Constant_Node(dim=(self.D[m],s.sum(Kconst),), value=qE[m][:,Kconst])
-                ConstThetaNode = Theta_Constant_Node(dim=(s.sum(Kconst),), value=qE[m][Kconst])
+                # ConstThetaNode = Theta_Constant_Node(dim=(self.D[m],np.sum(Kconst),), value=qE[m][:,Kconst])
+                ConstThetaNode = Theta_Constant_Node(dim=(np.sum(Kconst),), value=qE[m][Kconst])
                 Theta_list[m] = ConstThetaNode
 
             # Initialise non-constant node
@@ -251,7 +256,7 @@ class initModel(object):
                 LearnThetaNode = None
             else:
                 # FOR NOW WE JUST TAKE THE FIRST ROW BECAUSE IT IS EXPANDED. IT IS UGLY AS HELL
-                LearnThetaNode = Theta_Node(dim=(s.sum(Klearn),), pa=pa[m][Klearn], pb=pb[m][Klearn], qa=qa[m][Klearn], qb=qb[m][Klearn], qE=qE[m][Klearn])
+                LearnThetaNode = Theta_Node(dim=(np.sum(Klearn),), pa=pa[m][Klearn], pb=pb[m][Klearn], qa=qa[m][Klearn], qb=qb[m][Klearn], qE=qE[m][Klearn])
                 Theta_list[m] = LearnThetaNode
 
             # Initialise mixed node
@@ -279,7 +284,7 @@ class initModel(object):
 
     def initMuZ(self, clusters=None, pmean=0, pvar=1, qmean=0, qvar=1, qE=None):
         if clusters is None:
-            clusters = s.zeros(self.N, int)
+            clusters = np.zeros(self.N, int)
         self.MuZ = MuZ_Node_Gaussian(pmean, pvar, qmean, qvar, clusters, self.K)
         # self.Clusters = Constant_Node(pmean, pvar, qmean, qvar, clusters, self.K)
         self.nodes['MuZ'] = self.MuZ
@@ -1,4 +1,4 @@
-import scipy as s
+import numpy as np
 
 from .variational_nodes import Variational_Node
 from .nodes import Constant_Node
@@ -47,12 +47,12 @@ class Mixed_Theta_Nodes(Variational_Node, Constant_Node):
 
         # Concatenate
         # Concatenate expectations to (D,K)
-        E = s.concatenate((Econst["E"], Elearn["E"]), axis=0)
-        lnE = s.concatenate((Econst["lnE"], Elearn["lnE"]), axis=0)
-        lnEInv = s.concatenate((Econst["lnEInv"], Elearn["lnEInv"]), axis=0)        
+        E = np.concatenate((Econst["E"], Elearn["E"]), axis=0)
+        lnE = np.concatenate((Econst["lnE"], Elearn["lnE"]), axis=0)
+        lnEInv = np.concatenate((Econst["lnEInv"], Elearn["lnEInv"]), axis=0)        
 
         # Permute to the right order given by self.idx
-        # idx = s.concatenate((s.nonzero(1-self.idx)[0],s.where(self.idx)[0]), axis=0)
+        # idx = np.concatenate((np.nonzero(1-self.idx)[0],np.where(self.idx)[0]), axis=0)
         # E, lnE, lnEinv = E[idx], lnE[idx], lnEInv[idx]
 
         return dict({'E':E, 'lnE':lnE, 'lnEInv':lnEInv})
@@ -65,7 +65,7 @@ class Mixed_Theta_Nodes(Variational_Node, Constant_Node):
 
     def updateParameters(self):
         # the argument contains the indices of the non_annotated factors
-        self.learnTheta.updateParameters(s.nonzero(self.idx)[0])
+        self.learnTheta.updateParameters(np.nonzero(self.idx)[0])
 
     def calculateELBO(self):
         return self.learnTheta.calculateELBO()
@@ -73,9 +73,9 @@ class Mixed_Theta_Nodes(Variational_Node, Constant_Node):
     def removeFactors(self, *idx):
         for i in idx:
             if self.idx[idx] == 1:
-                self.learnTheta.removeFactors(s.where(i == s.nonzero(self.idx)[0])[0])
+                self.learnTheta.removeFactors(np.where(i == np.nonzero(self.idx)[0])[0])
             else:
-                self.constTheta.removeFactors(s.where(i == s.nonzero(1-self.idx)[0])[0])
-            self.idx = self.idx[s.arange(self.K)!=i]
+                self.constTheta.removeFactors(np.where(i == np.nonzero(1-self.idx)[0])[0])
+            self.idx = self.idx[np.arange(self.K)!=i]
             self.K -= 1
 
@@ -13,7 +13,7 @@ All multiview nodes have the following main attributes:
 - nodes: a list with the (single-view) nodes
 """
 
-import scipy as s
+import numpy as np
 
 from .nodes import Node
 from .variational_nodes import Variational_Node
@@ -72,6 +72,10 @@ class Multiview_Node(Node):
         """Method to get the masks"""
         return [ self.nodes[m].getMask() for m in self.activeM ]
 
+    def getObserved(self):
+        """Method to get the indicator matrices of the observed values"""
+        return [ self.nodes[m].getObserved() for m in self.activeM ]
+
     def getExpectation(self):
         """Method to get the first moments (expectation)"""
         return [ self.nodes[m].getExpectation() for m in self.activeM ]
@@ -94,7 +98,7 @@ class Multiview_Node(Node):
         m: iterable
             views to update
         """
-        assert s.all(m in self.activeM), "Trying to update the dimensionality of a node that doesnt exist in a view"
+        assert np.all(m in self.activeM), "Trying to update the dimensionality of a node that doesnt exist in a view"
         M = self.activeM if m is None else m
         for m in M: self.nodes[m].updateDim(axis,new_dim)
 
@@ -7,7 +7,6 @@ All nodes have two main attributes:
 
 """
 
-import scipy as s
 import numpy as np
 
 
@@ -90,7 +89,7 @@ class Constant_Node(Node):
     def __init__(self, dim, value):
         self.dim = dim
         if isinstance(value,(int,float)):
-            self.value = value * s.ones(dim)
+            self.value = value * np.ones(dim)
         else:
             assert value.shape == dim, "dimensionality mismatch"
             self.value = value
@@ -105,10 +104,10 @@ class Constant_Node(Node):
 
     def getExpectations(self):
         """ Method to return the expectations of the node, which just points to the values """
-        return { 'E':self.getValue(), 'lnE':s.log(self.getValue()), 'E2':self.getValue()**2 }
+        return { 'E':self.getValue(), 'lnE':np.log(self.getValue()), 'E2':self.getValue()**2 }
 
     def removeFactors(self, idx, axis=None):
         if hasattr(self,"factors_axis"): axis = self.factors_axis
         if axis is not None:
-            self.value = s.delete(self.value, idx, axis)
+            self.value = np.delete(self.value, idx, axis)
             self.updateDim(axis=axis, new_dim=self.dim[axis]-len(idx))
@@ -17,20 +17,20 @@ PseudoY: general class for pseudodata
 
 """
 
-from __future__ import division
-import scipy as s
+import numpy as np
 import numpy.ma as ma
+import scipy.special as special
 
 from .variational_nodes import Unobserved_Variational_Node
 from .nodes import Node
 
 
 def sigmoid(X):
-    return s.divide(1.,1.+s.exp(-X))
-    # return 1./(1.+s.exp(-X))
+    return np.divide(1.,1.+np.exp(-X))
+    # return 1./(1.+np.exp(-X))
 
 def lambdafn(X):
-    return s.tanh(X/2.)/(4.*X)
+    return np.tanh(X/2.)/(4.*X)
 
 ##############################
 ## General pseudodata nodes ##
@@ -64,6 +64,9 @@ class PseudoY(Unobserved_Variational_Node):
         if type(self.obs) != ma.MaskedArray:
             self.mask()
 
+        # Indicator matrix of the observed values, computed on demand
+        self.observed = None
+
         # Precompute some terms
         # self.precompute()
 
@@ -72,7 +75,7 @@ class PseudoY(Unobserved_Variational_Node):
             assert E.shape == dim, "Problems with the dimensionalities"
             E = ma.masked_invalid(E)
         # else:
-            # E = ma.masked_invalid(s.zeros(self.dim))
+            # E = ma.masked_invalid(np.zeros(self.dim))
         self.E = E
 
     def updateParameters(self):
@@ -85,6 +88,12 @@ class PseudoY(Unobserved_Variational_Node):
     def getMask(self):
         return ma.getmask(self.obs)
 
+    def getObserved(self):
+        # Indicator of the observed values, computed once as the missing values are fixed
+        if self.observed is None:
+            self.observed = (~self.getMask()).astype(self.obs.dtype)
+        return self.observed
+
     def updateExpectations(self):
         print("Error: expectation updates for pseudodata node depend on the type of likelihood. They have to be specified in a suclass.")
         exit()
@@ -124,7 +133,7 @@ class PseudoY_Seeger(PseudoY):
     def updateParameters(self):
         Z = self.markov_blanket["Z"].getExpectation()
         SW = self.markov_blanket["SW"].getExpectation()
-        self.params["zeta"] = s.dot(Z,SW.T)
+        self.params["zeta"] = np.dot(Z,SW.T)
 
     def calculateELBO(self):
         # Compute Lower Bound using the Gaussian likelihood with pseudodata
@@ -133,11 +142,11 @@ class PseudoY_Seeger(PseudoY):
         SW = self.markov_blanket["SW"].getExpectation()
         tau = self.markov_blanket["Tau"].getExpectation()
         N = Z.shape[0]
-        lb = 0.5*(N*ma.sum(s.log(tau)) - ma.sum(tau*(self.E-s.dot(Z,SW.T))**2 )) # (1) tau is of shape (D,) (2) missing a constant term
+        lb = 0.5*(N*ma.sum(np.log(tau)) - ma.sum(tau*(self.E-np.dot(Z,SW.T))**2 )) # (1) tau is of shape (D,) (2) missing a constant term
 
-        # tau_expanded = s.repeat(tau[None,:],N,0)
+        # tau_expanded = np.repeat(tau[None,:],N,0)
         # tau_expanded = ma.masked_where(ma.getmask(self.obs), tau_expanded)
-        # lb = 0.5*( ma.sum(s.log(tau_expanded)) - ma.sum(tau_expanded*(self.E-s.dot(Z,SW.T))**2 ) ) # (1) tau is of shape (D,) (2) missing a constant term
+        # lb = 0.5*( ma.sum(np.log(tau_expanded)) - ma.sum(tau_expanded*(self.E-np.dot(Z,SW.T))**2 ) ) # (1) tau is of shape (D,) (2) missing a constant term
         return lb
 
 class Poisson_PseudoY_Seeger(PseudoY_Seeger):
@@ -172,12 +181,12 @@ class Poisson_PseudoY_Seeger(PseudoY_Seeger):
         PseudoY_Seeger.__init__(self, dim=dim, obs=obs, params=params, E=E)
 
         # Initialise the observed data
-        assert s.all(s.mod(self.obs, 1) == 0), "Data must not contain float numbers, only integers"
-        assert s.all(self.obs >= 0), "Data must not contain negative numbers"
+        assert np.all(np.mod(self.obs, 1) == 0), "Data must not contain float numbers, only integers"
+        assert np.all(self.obs >= 0), "Data must not contain negative numbers"
 
     def ratefn(self, X):
         # Poisson rate function proposed in Seeger et al.
-        return s.log(1.+s.exp(X))
+        return np.log(1.+np.exp(X))
 
     def clip(self, threshold):
         # The local bound degrades with the presence of large values in the observed data, which should be clipped
@@ -189,8 +198,9 @@ class Poisson_PseudoY_Seeger(PseudoY_Seeger):
         self.E = self.params["zeta"] - sigmoid(self.params["zeta"])*(1.-self.obs/self.ratefn(self.params["zeta"])) / tau
         self.means = self.E.mean(axis=0).data
         self.E -= self.means
+        self.E.data[self.getMask()] = 0.
         # mask = self.getMask()
-        # self.E[mask] = s.nan
+        # self.E[mask] = np.nan
 
     def calculateELBO(self):
         """ Compute Lower Bound """
@@ -205,12 +215,12 @@ class Poisson_PseudoY_Seeger(PseudoY_Seeger):
 
         # Precompute terms
         ZW = Z.dot(W.T)
-        ZZWW = s.square(ZW) - s.dot(s.square(Z),s.square(W).T) + ZZ.dot(WW.T)
+        ZZWW = np.square(ZW) - np.dot(np.square(Z),np.square(W).T) + ZZ.dot(WW.T)
 
         # term1 = 0.5*tau*(ZW - zeta)**2
-        term1 = 0.5*tau*(ZZWW - 2*ZW*zeta + s.square(zeta))
+        term1 = 0.5*tau*(ZZWW - 2*ZW*zeta + np.square(zeta))
         term2 = (ZW - zeta)*(sigmoid(zeta)*(1-self.obs/self.ratefn(zeta)))
-        term3 = self.ratefn(zeta) - self.obs*s.log(self.ratefn(zeta))
+        term3 = self.ratefn(zeta) - self.obs*np.log(self.ratefn(zeta))
 
         elbo = -(term1 + term2 + term3)
         elbo[mask] = 0.
@@ -245,27 +255,28 @@ class Bernoulli_PseudoY_Seeger(PseudoY_Seeger):
         PseudoY_Seeger.__init__(self, dim=dim, obs=obs, params=params, E=E)
 
         # Initialise the observed data
-        assert s.all( (self.obs==0) | (self.obs==1) ), "Data modelled using bernoulli likelihood must be binary, encoded as 0s or 1s"
+        assert np.all( (self.obs==0) | (self.obs==1) ), "Data modelled using bernoulli likelihood must be binary, encoded as 0s or 1s"
 
     def updateExpectations(self):
         # Update the pseudodata
         self.E = self.params["zeta"] - 4.*(sigmoid(self.params["zeta"]) - self.obs)
         self.means = self.E.mean(axis=0).data
         self.E -= self.means
+        self.E.data[self.getMask()] = 0.
         
     def calculateELBO(self):
         Z = self.markov_blanket["Z"].getExpectation()
         W = self.markov_blanket["SW"].getExpectation()
         mask = self.getMask()
-        tmp = s.dot(Z,W.T)
+        tmp = np.dot(Z,W.T)
         
         # Compute Lower Bound using the Bernoulli likelihood and the observed data
-        lb = self.obs.data*tmp - s.log(1.+s.exp(tmp))
+        lb = self.obs.data*tmp - np.log(1.+np.exp(tmp))
         lb[mask] = 0.
 
         # Compute Lower Bound using the gaussian likelihood with pseudo data
         # MISSING CONSTANT TERM
-        # term1 = 0.5*s.log(self.params["zeta"])
+        # term1 = 0.5*np.log(self.params["zeta"])
         # term2 = 0.5*self.params["zeta"]*(self.E-tmp)**2
         # lb = term1 - term2
         # lb[mask] = 0.
@@ -299,9 +310,9 @@ class Binomial_PseudoY_Seeger(PseudoY_Seeger):
         PseudoY_Seeger.__init__(self, dim=dim, obs=None, params=params, E=E)
 
         # Initialise the observed data
-        assert s.all(s.mod(obs, 1) == 0) and s.all(s.mod(tot, 1) == 0), "Data must not contain float numbers, only integers"
-        assert s.all(obs >= 0) and s.all(tot >= 0), "Data must not contain negative numbers"
-        assert s.all(obs <= tot), "Observed counts have to be equal or smaller than the total counts"
+        assert np.all(np.mod(obs, 1) == 0) and np.all(np.mod(tot, 1) == 0), "Data must not contain float numbers, only integers"
+        assert np.all(obs >= 0) and np.all(tot >= 0), "Data must not contain negative numbers"
+        assert np.all(obs <= tot), "Observed counts have to be equal or smaller than the total counts"
         self.obs = obs
         self.tot = tot
 
@@ -309,7 +320,7 @@ class Binomial_PseudoY_Seeger(PseudoY_Seeger):
     def updateExpectations(self):
         # Update the pseudodata
         tau = self.markov_blanket["Tau"].getValue()
-        self.E = self.params["zeta"] - s.divide(self.tot*sigmoid(self.params["zeta"])-self.obs, tau)
+        self.E = self.params["zeta"] - np.divide(self.tot*sigmoid(self.params["zeta"])-self.obs, tau)
         pass
 
     def calculateELBO(self):
@@ -317,13 +328,13 @@ class Binomial_PseudoY_Seeger(PseudoY_Seeger):
         Z = self.markov_blanket["Z"].getExpectation()
         SW = self.markov_blanket["SW"].getExpectation()
 
-        tmp = sigmoid(s.dot(Z,SW.T))
+        tmp = sigmoid(np.dot(Z,SW.T))
 
         # TODO change apprximation
         tmp[tmp==0] = 0.00000001
         tmp[tmp==1] = 0.99999999
-        lik = s.log(s.special.binom(self.tot,self.obs)).sum() + s.sum(self.obs*s.log(tmp)) + \
-            s.sum((self.tot-self.obs)*s.log(1-tmp))
+        lik = np.log(special.binom(self.tot,self.obs)).sum() + np.sum(self.obs*np.log(tmp)) + \
+            np.sum((self.tot-self.obs)*np.log(1-tmp))
         return lik
 
 
@@ -340,7 +351,7 @@ class Tau_Jaakkola(Node):
         Node.__init__(self, dim=dim)
 
         if isinstance(value,(int,float)):
-            self.value = value * s.ones(dim)
+            self.value = value * np.ones(dim)
         else:
             assert value.shape == dim, "Dimensionality mismatch"
             self.value = value
@@ -355,7 +366,7 @@ class Tau_Jaakkola(Node):
         return self.getValue()
 
     def getExpectations(self):
-        return { 'E':self.getValue(), 'lnE':s.log(self.getValue()) }
+        return { 'E':self.getValue(), 'lnE':np.log(self.getValue()) }
 
     def removeFactors(self, idx, axis=None):
         pass
@@ -385,18 +396,19 @@ class Bernoulli_PseudoY_Jaakkola(PseudoY):
     def __init__(self, dim, obs, params=None, E=None):
         PseudoY.__init__(self, dim=dim, obs=obs, params=params, E=E)
         # Initialise the observed data
-        assert s.all( (self.obs==0) | (self.obs==1) ), "Data modelled using bernoulli likelihood must be binary, encoded as 0s or 1s"
+        assert np.all( (self.obs==0) | (self.obs==1) ), "Data modelled using bernoulli likelihood must be binary, encoded as 0s or 1s"
 
     def updateExpectations(self):
         self.E = (2.*self.obs - 1.) / (4.*lambdafn(self.params["zeta"]))
         self.means = self.E.mean(axis=0).data
         self.E -= self.means
+        self.E.data[self.getMask()] = 0.
 
 
     def updateParameters(self):
         Z = self.markov_blanket["Z"].getExpectations()
         SW = self.markov_blanket["SW"].getExpectations()
-        self.params["zeta"] = s.sqrt( s.square(Z["E"].dot(SW["E"].T)) - s.dot(s.square(Z["E"]),s.square(SW["E"].T)) + s.dot(Z["E2"], SW["ESWW"].T) )
+        self.params["zeta"] = np.sqrt( np.square(Z["E"].dot(SW["E"].T)) - np.dot(np.square(Z["E"]),np.square(SW["E"].T)) + np.dot(Z["E2"], SW["ESWW"].T) )
 
     def calculateELBO(self):
         Z = self.markov_blanket["Z"].getExpectation()
@@ -409,13 +421,13 @@ class Bernoulli_PseudoY_Jaakkola(PseudoY):
 
         # Compute Lower Bound using the Bernoulli likelihood and the observed data
         # BOTH ARE WRONG AS THEY EXCHANGE LOG AND EXPECTATIONS
-        # lb = self.obs.data*tmp - s.log(1.+s.exp(tmp))
-        # lb = s.log(1.+s.exp(-(2.*self.obs-1)*tmp)) # DAMIEN'S suggestion
+        # lb = self.obs.data*tmp - np.log(1.+np.exp(tmp))
+        # lb = np.log(1.+np.exp(-(2.*self.obs-1)*tmp)) # DAMIEN'S suggestion
         # lb[mask] = 0.
 
         # Compute Lower Bound using the gaussian likelihood with pseudo data
         # MISSING CONSTANT TERM
-        # term1 = 0.5*s.log(self.params["zeta"])
+        # term1 = 0.5*np.log(self.params["zeta"])
         # term2 = 0.5*self.params["zeta"]*(self.E-tmp)**2
         # lb = term1 - term2
         # lb[mask] = 0.
@@ -424,18 +436,18 @@ class Bernoulli_PseudoY_Jaakkola(PseudoY):
 
         # calculate E(Z)E(W)
         ZW = Z.dot(SW.T)
-        ZW[mask] = 0.
+        ZW *= self.getObserved()
 
         # Calculate E[(ZW_nd)^2]
         # this is equal to E[\sum_{k != k} z_k w_k z_k' w_k'] + E[\sum_{k} z_k^2 w_k^2]
-        tmp1 = s.square(ZW) - s.dot(s.square(Z),s.square(SW).T) # this is for terms in k != k'
+        tmp1 = np.square(ZW) - np.dot(np.square(Z),np.square(SW).T) # this is for terms in k != k'
         tmp2 = ZZ.dot(SWW.T) # this is for terms in k = k'
         EZZWW = tmp1 + tmp2
 
         # calculate elbo terms
         term1 = 0.5 * ((2.*self.obs.data - 1.)*ZW - zeta)
-        term2 = - s.log(1 + s.exp(-zeta))
-        term3 = - 1/(4 * zeta) *  s.tanh(zeta/2.) * (EZZWW - zeta**2)
+        term2 = - np.log(1 + np.exp(-zeta))
+        term3 = - 1/(4 * zeta) *  np.tanh(zeta/2.) * (EZZWW - zeta**2)
 
         lb = term1 + term2 + term3
         lb[mask] = 0.
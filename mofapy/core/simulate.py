@@ -7,18 +7,17 @@ To-do:
 - Fix binomial
 """
 
-from __future__ import division
-import scipy as s
+import numpy as np
+import scipy.special as special
 import pandas as pd
 import warnings
-from scipy.stats import bernoulli, norm, gamma, uniform, poisson, binom
 from random import sample
 
 def sigmoid(X):
-    return s.divide(1.,1.+s.exp(-X))
+    return np.divide(1.,1.+np.exp(-X))
 
 class Simulate(object):
-    def __init__(self, M, N, D, K):
+    def __init__(self, M, N, D, K, seed=None):
         """General method to Simulate from the generative model
 
         PARAMETERS
@@ -27,6 +26,7 @@ class Simulate(object):
         N (int): number of samples
         D (list/tuple of length M): dimensionality of each view
         K (int): number of latent variables
+        seed (int): seed for a new random number generator, the global numpy random state is used if None
         """
 
         # Sanity checks
@@ -39,11 +39,18 @@ class Simulate(object):
         self.K = K
         self.D = D
 
+        # Random number generator shared by all the simulations. Without a seed the global
+        # numpy random state is used, so that scripts seeding it with np.random.seed stay reproducible
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        else:
+            self.rng = np.random
+
     def initAlpha(self):
         """ Initialisation of ARD on the weights"""
-        alpha = [ s.zeros(self.K,) for m in range(self.M) ]
+        alpha = [ np.zeros(self.K,) for m in range(self.M) ]
         for m in range(self.M):
-            tmp = bernoulli.rvs(p=0.5, size=self.K)
+            tmp = self.rng.binomial(1, 0.5, size=self.K)
             tmp[tmp==1] = 1.
             tmp[tmp==0] = 1E5
             alpha[m] = tmp
@@ -53,10 +60,7 @@ class Simulate(object):
         """ Initialisation of weights in automatic relevance determination prior"""
         if alpha is None:
             alpha = self.initAlpha()
-        W = [ s.zeros((self.D[m],self.K)) for m in range(self.M) ]
-        for m in range(self.M):
-            for k in range(self.K):
-                W[m][:,k] = norm.rvs(loc=0, scale=1/s.sqrt(alpha[m][k]), size=self.D[m])
+        W = [ self.rng.standard_normal((self.D[m],self.K)) / np.sqrt(alpha[m]) for m in range(self.M) ]
         return W,alpha
 
     def initW_spikeslab(self, theta, alpha=None):
@@ -69,7 +73,7 @@ class Simulate(object):
             assert not any([0 in a for a in alpha]), 'alpha cannot be zero'
 
         # Simulate bernoulli variable S
-        S = [ s.zeros((self.D[m],self.K)) for m in range(self.M) ]
+        S = [ np.zeros((self.D[m],self.K)) for m in range(self.M) ]
         for m in range(self.M):
 
             # Completely vectorised, not sure if it works
@@ -77,7 +81,7 @@ class Simulate(object):
 
             # Partially vectorised
             for k in range(self.K):
-                S[m][:,k] = bernoulli.rvs(p=theta[m][:,k], size=self.D[m])
+                S[m][:,k] = self.rng.binomial(1, theta[m][:,k], size=self.D[m])
             
             # Unvectorised
             # for d in range(self.D[m]):
@@ -86,26 +90,21 @@ class Simulate(object):
 
 
         # Simulate gaussian weights W
-        W_hat = [ s.empty((self.D[m],self.K)) for m in range(self.M) ]
-        W = [ s.empty((self.D[m],self.K)) for m in range(self.M) ]
+        W_hat = [ np.empty((self.D[m],self.K)) for m in range(self.M) ]
+        W = [ np.empty((self.D[m],self.K)) for m in range(self.M) ]
         for m in range(self.M):
-            for k in range(self.K):
-                W_hat[m][:,k] = norm.rvs(loc=0, scale=s.sqrt(1./alpha[m][k]), size=self.D[m])
+            W_hat[m] = self.rng.standard_normal((self.D[m],self.K)) * np.sqrt(1./alpha[m])
             W[m] = W_hat[m] * S[m]
 
         return S, W, W_hat, alpha
 
     def initZ(self):
         """ Initialisation of latent variables"""
-        Z = s.empty((self.N,self.K))
-        for n in range(self.N):
-            for k in range(self.K):
-                Z[n,k] = norm.rvs(loc=0, scale=1, size=1)
-        return Z
+        return self.rng.standard_normal((self.N,self.K))
 
     def initTau(self):
         """ Initialisation of noise precision"""
-        return [ uniform.rvs(loc=1,scale=3,size=self.D[m]) for m in range(self.M) ]
+        return [ self.rng.uniform(1, 4, size=self.D[m]) for m in range(self.M) ]
 
     def generateData(self, W, Z, Tau, likelihood, missingness=0.0, missing_view=False):
         """ Initialisation of observations 
@@ -119,19 +118,19 @@ class Simulate(object):
         missingness (float): percentage of missing values
         """
 
-        Y = [ s.zeros((self.N,self.D[m])) for m in range(self.M) ]
-        F = [ s.zeros((self.N,self.D[m])) for m in range(self.M) ]
+        Y = [ np.zeros((self.N,self.D[m])) for m in range(self.M) ]
+        F = [ np.zeros((self.N,self.D[m])) for m in range(self.M) ]
 
         if likelihood == "gaussian":
             # Vectorised
             for m in range(self.M):
-                F[m] = s.dot(Z,W[m].T) + norm.rvs(loc=0, scale=1/s.sqrt(Tau[m]), size=[self.N, self.D[m]])
+                F[m] = np.dot(Z,W[m].T) + self.rng.standard_normal((self.N,self.D[m])) / np.sqrt(Tau[m])
                 Y[m] = F[m]
             # Non-vectorised, slow
             # for m in range(self.M):
                 # for n in range(self.N):
                     # for d in range(self.D[m]):
-                        # Y[m][n,d] = s.dot(Z[n,:],W[m][d,:].T) + norm.rvs(loc=0,scale=1/s.sqrt(Tau[m][d]))
+                        # Y[m][n,d] = np.dot(Z[n,:],W[m][d,:].T) + norm.rvs(loc=0,scale=1/np.sqrt(Tau[m][d]))
 
         # Sample observations using a poisson likelihood
         elif likelihood == "poisson":
@@ -140,20 +139,20 @@ class Simulate(object):
             # for m in range(self.M):
             #     for n in range(self.N):
             #         for d in range(self.D[m]):
-            #             f = s.dot(Z[n,:],W[m][d,:].T)
-            #             # f = s.dot(Z[n,:],W[m][d,:].T) + norm.rvs(loc=0,scale=s.sqrt(1/Tau[m][d]))
-            #             rate = s.log(1+s.exp(f))
+            #             f = np.dot(Z[n,:],W[m][d,:].T)
+            #             # f = np.dot(Z[n,:],W[m][d,:].T) + norm.rvs(loc=0,scale=np.sqrt(1/Tau[m][d]))
+            #             rate = np.log(1+np.exp(f))
             #             # Sample from the Poisson distribution
             #             # Y[m][n,d] = poisson.rvs(rate)
             #             # Use the more likely values
-            #             Y[m][n,d] = s.special.round(rate)
+            #             Y[m][n,d] = special.round(rate)
 
             ## Vectorised
             for m in range(self.M):
-                F[m] = s.dot(Z,W[m].T)
+                F[m] = np.dot(Z,W[m].T)
 
                 # Without noise
-                Y[m] = s.special.round(s.log(1.+s.exp(F[m])))
+                Y[m] = special.round(np.log(1.+np.exp(F[m])))
 
                 # With noise, sample from the Poisson distribution
                 # Y[m] = poisson.rvs(rate).astype(float)
@@ -163,10 +162,10 @@ class Simulate(object):
             for m in range(self.M):
 
                 ## Vectorised 
-                F[m] = s.dot(Z,W[m].T)
+                F[m] = np.dot(Z,W[m].T)
 
                 # without noise
-                Y[m] = s.special.round(sigmoid(F[m]))
+                Y[m] = special.round(sigmoid(F[m]))
 
                 # with noise
                 # Y[m] = bernoulli.rvs(f).astype(float)
@@ -176,25 +175,25 @@ class Simulate(object):
                 # for n in range(self.N):
                     # for d in range(self.D[m]):
                         # Without noise
-                        # f = sigmoid( s.dot(Z[n,:],W[m][d,:].T) )
+                        # f = sigmoid( np.dot(Z[n,:],W[m][d,:].T) )
 
                         # With noise
                         # Y[m][n,d] = bernoulli.rvs(f)
                         # Use the more likely state
-                        # Y[m][n,d] = s.special.round(f)
+                        # Y[m][n,d] = special.round(f)
 
 
         # Introduce missing values into the data
         if missingness > 0.0:
             for m in range(self.M):
-                nas = s.random.choice(range(self.N*self.D[m]), size=int(missingness*self.N*self.D[m]), replace=False)
+                nas = self.rng.choice(self.N*self.D[m], size=int(missingness*self.N*self.D[m]), replace=False)
                 tmp = Y[m].flatten()
-                tmp[nas] = s.nan
+                tmp[nas] = np.nan
                 Y[m] = tmp.reshape((self.N,self.D[m]))
         if missing_view > 0.0:   # percentage of samples missing a view
             # select samples missing one view
-            n_missing = s.random.choice(range(self.N), int(missing_view * self.N), replace=False)
-            Y[0][n_missing,:] = s.nan
+            n_missing = self.rng.choice(self.N, int(missing_view * self.N), replace=False)
+            Y[0][n_missing,:] = np.nan
 
         # Convert data to pandas data frame
         for m in range(self.M):
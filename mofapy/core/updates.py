@@ -1,4 +1,3 @@
-from __future__ import division
 import numpy.ma as ma
 import numpy as np
 import warnings
@@ -40,10 +39,18 @@ class Y_Node(Constant_Variational_Node):
         if type(self.value) != ma.MaskedArray:
             self.mask()
 
+        # Store the missing values as zeros, so that the updates can use the underlying data directly.
+        # This is also needed for masked arrays given as input, which can hold any value under the mask
+        self.value.data[self.getMask()] = 0.
+
+        # Indicator matrix of the observed values, computed on demand
+        self.observed = None
+
     def precompute(self):
         # Precompute some terms to speed up the calculations
         self.N = self.dim[0] - ma.getmask(self.value).sum(axis=0)
-        self.likconst = -0.5*s.sum(self.N)*s.log(2.*s.pi)
+        self.complete = np.all(self.N == self.dim[0])
+        self.likconst = -0.5*np.sum(self.N)*np.log(2.*np.pi)
         self.means = self.value.mean(axis=0).data
 
     def mask(self):
@@ -53,6 +60,13 @@ class Y_Node(Constant_Variational_Node):
     def getMask(self):
         return ma.getmask(self.value)
 
+    def getObserved(self):
+        # The missing values are fixed, so the indicator of the observed values is computed once and
+        # used to zero out the missing entries by multiplication instead of boolean indexing
+        if self.observed is None:
+            self.observed = (~self.getMask()).astype(self.value.dtype)
+        return self.observed
+
     def calculateELBO(self):
         # Calculate evidence lower bound
         # We use the trick that the update of Tau already contains the Gaussian likelihod.
@@ -62,7 +76,7 @@ class Y_Node(Constant_Variational_Node):
         tau_exp = self.markov_blanket["Tau"].getExpectations(expand=False)
 
         # Important: this assumes that the Tau update has been done beforehand
-        lik = self.likconst + 0.5*s.sum(self.N*(tau_exp["lnE"])) - s.dot(tau_exp["E"],tauQ_param["b"]-tauP_param["b"])
+        lik = self.likconst + 0.5*np.sum(self.N*(tau_exp["lnE"])) - np.dot(tau_exp["E"],tauQ_param["b"]-tauP_param["b"])
         return lik
 
 class Tau_Node(Gamma_Unobserved_Variational_Node):
@@ -81,14 +95,13 @@ class Tau_Node(Gamma_Unobserved_Variational_Node):
         self.Q.params['a'] = Qa
 
         # constant lower bound term
-        self.lbconst = s.sum(self.P.params['a']*s.log(self.P.params['b']) - special.gammaln(self.P.params['a']))
+        self.lbconst = np.sum(self.P.params['a']*np.log(self.P.params['b']) - special.gammaln(self.P.params['a']))
 
     def updateParameters(self):
 
         # Collect expectations from other nodes
         Y = self.markov_blanket["Y"].getExpectation()
         # mask = ma.getmask(Y)
-        mask = self.markov_blanket["Y"].getMask()
         
         Wtmp = self.markov_blanket["SW"].getExpectations()
         Ztmp = self.markov_blanket["Z"].getExpectations()
@@ -101,26 +114,34 @@ class Tau_Node(Gamma_Unobserved_Variational_Node):
 
         # Mask matrices
         Y = Y.data
-        Y[mask] = 0.
-
-        # Calculate temporary terms for the update
-        ZW = Z.dot(SW.T)
-        ZW[mask] = 0.
 
         # Calculate terms for the update
-        term1 = s.square(Y).sum(axis=0)
+        # The sums over the observed samples are contracted over the factors to avoid (N,D) temporaries
+        term1 = np.square(Y).sum(axis=0)
+
+        if self.markov_blanket["Y"].complete:
+            # All samples are observed, so the squared prediction only needs E[Z]'E[Z]
+            ZtZ = self.markov_blanket["Z"].getZtZ()
 
-        term2 = ZZ.dot(SWW.T)
-        term2[mask] = 0
-        term2 = term2.sum(axis=0)
+            term2 = np.dot(SWW,ZZ.sum(axis=0))
 
-        term3 = np.dot(np.square(Z),np.square(SW).T)
-        term3[mask] = 0.
-        term3 = -term3.sum(axis=0)
-        term3 += np.square(ZW).sum(axis=0)
+            term3 = -np.dot(np.square(SW),np.square(Z).sum(axis=0))
+            term3 += (np.dot(SW,ZtZ)*SW).sum(axis=1)
+        else:
+            obs = self.markov_blanket["Y"].getObserved()
+            obsT = obs.T
+
+            # Calculate temporary terms for the update
+            ZW = Z.dot(SW.T)
+            ZW *= obs
+
+            term2 = (np.dot(obsT,ZZ)*SWW).sum(axis=1)
 
-        ZW *= Y  # Warning for developers: ZW becomes ZWY
-        term4 = 2.*(ZW.sum(axis=0))
+            term3 = -(np.dot(obsT,np.square(Z))*np.square(SW)).sum(axis=1)
+            term3 += np.square(ZW).sum(axis=0)
+
+        # The projection of the data is accumulated in double precision, as Tau enters the ELBO directly
+        term4 = 2.*(np.dot(Y.T,Z)*SW).sum(axis=1)
 
         tmp = term1 + term2 + term3 - term4
 
@@ -137,8 +158,8 @@ class Tau_Node(Gamma_Unobserved_Variational_Node):
         QE, QlnE = self.Q.expectations['E'], self.Q.expectations['lnE']
 
         # Do the calculations
-        lb_p = self.lbconst + s.sum((Pa-1.)*QlnE) - s.sum(Pb*QE)
-        lb_q = s.sum(Qa*s.log(Qb)) + s.sum((Qa-1.)*QlnE) - s.sum(Qb*QE) - s.sum(special.gammaln(Qa))
+        lb_p = self.lbconst + np.sum((Pa-1.)*QlnE) - np.sum(Pb*QE)
+        lb_q = np.sum(Qa*np.log(Qb)) + np.sum((Qa-1.)*QlnE) - np.sum(Qb*QE) - np.sum(special.gammaln(Qa))
 
         return lb_p - lb_q
 
@@ -146,8 +167,8 @@ class Tau_Node(Gamma_Unobserved_Variational_Node):
         QExp = self.Q.getExpectations()
         if expand:
             N = self.markov_blanket['Z'].dim[0]
-            expanded_E = s.repeat(QExp['E'][None, :], N, axis=0)
-            expanded_lnE = s.repeat(QExp['lnE'][None, :], N, axis=0)
+            expanded_E = np.repeat(QExp['E'][None, :], N, axis=0)
+            expanded_lnE = np.repeat(QExp['lnE'][None, :], N, axis=0)
             return {'E': expanded_E, 'lnE': expanded_lnE}
         else:
             return QExp
@@ -162,8 +183,8 @@ class Alpha_Node(Gamma_Unobserved_Variational_Node):
         super(Alpha_Node,self).__init__(dim=dim, pa=pa, pb=pb, qa=qa, qb=qb, qE=qE)
 
     def precompute(self):
-        # self.lbconst = self.K * ( self.P.a*s.log(self.P.b) - special.gammaln(self.P.a) )
-        # self.lbconst = s.sum( self.P.params['a']*s.log(self.P.params['b']) - special.gammaln(self.P.params['a']) )
+        # self.lbconst = self.K * ( self.P.a*np.log(self.P.b) - special.gammaln(self.P.a) )
+        # self.lbconst = np.sum( self.P.params['a']*np.log(self.P.params['b']) - special.gammaln(self.P.params['a']) )
         self.factors_axis = 0
 
     def updateParameters(self):
@@ -189,8 +210,8 @@ class Alpha_Node(Gamma_Unobserved_Variational_Node):
         QExp['lnE'] = QExp['lnE']
         if expand:
             D = self.markov_blanket['SW'].dim[0]
-            expanded_E = s.repeat(QExp['E'][None, :], D, axis=0)
-            expanded_lnE = s.repeat(QExp['lnE'][None, :], D, axis=0)
+            expanded_E = np.repeat(QExp['E'][None, :], D, axis=0)
+            expanded_lnE = np.repeat(QExp['lnE'][None, :], D, axis=0)
             return {'E': expanded_E, 'lnE': expanded_lnE}
         else:
             return QExp
@@ -206,8 +227,8 @@ class Alpha_Node(Gamma_Unobserved_Variational_Node):
         QE, QlnE = self.Q.getExpectations()['E'], self.Q.getExpectations()['lnE']
 
         # Do the calculations
-        lb_p = (Pa*s.log(Pb)).sum() - special.gammaln(Pa).sum() + ((Pa-1.)*QlnE).sum() - (Pb*QE).sum()
-        lb_q = (Qa*s.log(Qb)).sum() - special.gammaln(Qa).sum() + ((Qa-1.)*QlnE).sum() - (Qb*QE).sum()
+        lb_p = (Pa*np.log(Pb)).sum() - special.gammaln(Pa).sum() + ((Pa-1.)*QlnE).sum() - (Pb*QE).sum()
+        lb_q = (Qa*np.log(Qb)).sum() - special.gammaln(Qa).sum() + ((Qa-1.)*QlnE).sum() - (Qb*QE).sum()
 
         return lb_p - lb_q
 
@@ -223,12 +244,10 @@ class SW_Node(BernoulliGaussian_Unobserved_Variational_Node):
         # Collect expectations from other nodes
         Ztmp = self.markov_blanket["Z"].getExpectations()
         Z,ZZ = Ztmp["E"],Ztmp["E2"]
-        tau = self.markov_blanket["Tau"].getExpectation()
         Y = self.markov_blanket["Y"].getExpectation()
         alpha = self.markov_blanket["Alpha"].getExpectation(expand=False)
         thetatmp = self.markov_blanket["Theta"].getExpectations()
         theta_lnE, theta_lnEInv  = thetatmp['lnE'], thetatmp['lnEInv']
-        mask = self.markov_blanket["Y"].getMask()
         # mask = ma.getmask(Y)
 
         # Collect parameters and expectations from P and Q distributions of this node
@@ -239,33 +258,49 @@ class SW_Node(BernoulliGaussian_Unobserved_Variational_Node):
         # Mask matrices
         # Ymean = Y.mean(axis=0)
         Y = Y.data
-        Y[mask] = 0.
-        tau[mask] = 0.
+
+        # In fully observed gaussian views the noise precision is the same for all samples,
+        # so the sums over samples reduce to products with E[Z]'E[Z]
+        homoscedastic = isinstance(self.markov_blanket["Tau"],Tau_Node) and self.markov_blanket["Y"].complete
 
         # precompute terms used for all factors
-        tauYT = (tau*Y).T
+        if homoscedastic:
+            tau = self.markov_blanket["Tau"].getExpectation(expand=False)
+            ZtZ = self.markov_blanket["Z"].getZtZ()
+            tauYZ = np.dot(Y.T,Z)*tau[:,None]
+            tauZZ = np.outer(ZZ.sum(axis=0),tau)
+        else:
+            tau = self.markov_blanket["Tau"].getExpectation()
+            tau *= self.markov_blanket["Y"].getObserved()
+            tauYZ = np.dot((tau*Y).T,Z)
+            tauZZ = np.dot(ZZ.T,tau)
+
+        # prior terms of the sparsity and the ARD, shared by all features
+        theta_lnOdds = theta_lnE-theta_lnEInv
+        half_lnAlpha = 0.5*np.log(alpha)
 
         for k in range(self.dim[1]):
             # Calculate intermediate steps
-            term1 = (theta_lnE-theta_lnEInv)[k]
-            term2 = 0.5*s.log(alpha[k])
-            term3 = 0.5*s.log(s.dot(ZZ[:,k], tau) + alpha[k])
+            term1 = theta_lnOdds[k]
+            term2 = half_lnAlpha[k]
+            term4_tmp3 = tauZZ[k,:] + alpha[k]
+            term3 = 0.5*np.log(term4_tmp3)
 
-            term4_tmp1 = s.dot(tauYT,Z[:,k])
+            term4_tmp1 = tauYZ[:,k]
 
-            term4_tmp2_1 = SW[:,s.arange(self.dim[1])!=k].T
-            term4_tmp2_2 = (Z[:,k]*Z[:,s.arange(self.dim[1])!=k].T).T
-            term4_tmp2 = s.dot(term4_tmp2_2, term4_tmp2_1)
-            term4_tmp2 *= tau
-            term4_tmp2 = term4_tmp2.sum(axis=0)
+            # contribution of the other factors, the current factor is subtracted from the prediction
+            if homoscedastic:
+                term4_tmp2 = tau*(np.dot(SW,ZtZ[:,k]) - SW[:,k]*ZtZ[k,k])
+            else:
+                # tau-weighted products of factor k with all factors, tauZkZ[j,d] = sum_n tau[n,d]*Z[n,k]*Z[n,j]
+                tauZkZ = np.dot(Z.T*Z[:,k], tau)
+                term4_tmp2 = np.einsum('jd,dj->d', tauZkZ, SW) - SW[:,k]*tauZkZ[k,:]
 
-            term4_tmp3 = s.dot(ZZ[:,k].T,tau) + alpha[k]
-
-            term4 = 0.5*s.divide(s.square(term4_tmp1-term4_tmp2),term4_tmp3)
+            term4 = 0.5*np.divide(np.square(term4_tmp1-term4_tmp2),term4_tmp3)
 
             # Update S
             # NOTE there could be some precision issues in S --> loads of 1s in result
-            Qtheta[:,k] = 1./(1.+s.exp(-(term1+term2-term3+term4)))
+            Qtheta[:,k] = 1./(1.+np.exp(-(term1+term2-term3+term4)))
 
             # Update W
             Qvar_S1[:,k] = 1./term4_tmp3
@@ -276,7 +311,7 @@ class SW_Node(BernoulliGaussian_Unobserved_Variational_Node):
 
         # Save updated parameters of the Q distribution
         # self.Q.setParameters(mean_S0=0., var_S0=1./alpha, mean_S1=Qmean_S1, var_S1=Qvar_S1, theta=Qtheta )
-        self.Q.setParameters(mean_S0=s.zeros((self.dim[0],self.dim[1])), var_S0=s.repeat(1./alpha[None,:],self.dim[0],0), mean_S1=Qmean_S1, var_S1=Qvar_S1, theta=Qtheta )
+        self.Q.setParameters(mean_S0=np.zeros((self.dim[0],self.dim[1])), var_S0=np.repeat(1./alpha[None,:],self.dim[0],0), mean_S1=Qmean_S1, var_S1=Qvar_S1, theta=Qtheta )
 
     def calculateELBO(self):
 
@@ -288,17 +323,18 @@ class SW_Node(BernoulliGaussian_Unobserved_Variational_Node):
         alpha = self.markov_blanket["Alpha"].getExpectations(expand=False)
 
         # Calculate ELBO for W
-        lb_pw = 0.5*(self.dim[0]*alpha["lnE"].sum() - s.sum(alpha["E"]*WW))
-        lb_qw = -0.5*self.dim[1]*self.dim[0] - 0.5*(S*s.log(Qvar) + (1.-S)*s.log(1./alpha["E"])).sum()
+        lb_pw = 0.5*(self.dim[0]*alpha["lnE"].sum() - np.sum(alpha["E"]*WW))
+        # the prior variance of the spike only depends on the factor, so its term is summed over features first
+        lb_qw = -0.5*self.dim[1]*self.dim[0] - 0.5*((S*np.log(Qvar)).sum() - np.dot((1.-S).sum(axis=0),np.log(alpha["E"])))
         lb_w = lb_pw - lb_qw
 
         # Calculate ELBO for S
         # TO-DO: CHECK THAT THE BROADCASTING IS CORRECT FOR THETA
         lb_ps = S*theta['lnE'] + (1.-S)*theta['lnEInv']
-        lb_qs = S*s.log(S) + (1.-S)*s.log(1.-S)
-        lb_ps[s.isnan(lb_ps)] = 0.
-        lb_qs[s.isnan(lb_qs)] = 0.
-        lb_s = s.sum(lb_ps) - s.sum(lb_qs)
+        lb_ps[np.isnan(lb_ps)] = 0.
+        # entropy of Q(S), entr takes the limit 0*log(0)=0 for S equal to 0 or 1
+        lb_qs = -(special.entr(S) + special.entr(1.-S))
+        lb_s = np.sum(lb_ps) - np.sum(lb_qs)
 
         return lb_w + lb_s
 
@@ -368,8 +404,8 @@ class Theta_Constant_Node(Constant_Variational_Node):
 
     def precompute(self):
         self.E = self.value
-        self.lnE = s.log(self.value)
-        self.lnEInv = s.log(1.-self.value)
+        self.lnE = np.log(self.value)
+        self.lnEInv = np.log(1.-self.value)
 
     def getExpectations(self):
         return { 'E':self.E, 'lnE':self.lnE, 'lnEInv':self.lnEInv }
@@ -378,7 +414,7 @@ class Theta_Constant_Node(Constant_Variational_Node):
         # Ideally we want this node to use the removeFactors defined in Node()
         # but the problem is that we also need to update the "expectations", so i need
         # to call precompute()
-        self.value = s.delete(self.value, idx, axis)
+        self.value = np.delete(self.value, idx, axis)
         self.precompute()
         self.updateDim(axis=axis, new_dim=self.dim[axis]-len(idx))
 
@@ -388,6 +424,9 @@ class Z_Node(UnivariateGaussian_Unobserved_Variational_Node):
 
         self.covariates = np.zeros(self.dim[1], dtype=bool)
 
+        # Cache for E[Z]'E[Z], shared by the nodes of all views
+        self.ZtZ = None
+
         # Define indices for covariates
         if idx_covariates is not None:
             self.covariates[idx_covariates] = True
@@ -413,7 +452,7 @@ class Z_Node(UnivariateGaussian_Unobserved_Variational_Node):
         tau = self.markov_blanket["Tau"].getExpectation()
         latent_variables = self.getLvIndex() # excluding covariates from the list of latent variables
         # mask = [ ma.getmask(Y[m]) for m in range(len(Y)) ]
-        mask = self.markov_blanket["Y"].getMask()
+        obs = self.markov_blanket["Y"].getObserved()
 
         # Collect parameters from the prior or expectations from the markov blanket
         Alpha = 1./self.P.getParameters()["var"]
@@ -421,41 +460,57 @@ class Z_Node(UnivariateGaussian_Unobserved_Variational_Node):
         # Mask data
         for m in range(len(Y)):
             # Mask tau
-            tau[m][mask[m]] = 0.
-            # Mask Y
+            tau[m] *= obs[m]
+            # Missing values of Y are already stored as zeros
             Y[m] = Y[m].data
-            Y[m][mask[m]] = 0.
 
         # Collect parameters from the P and Q distributions of this node
         Q = self.Q.getParameters().copy()
         Qmean, Qvar = Q['mean'], Q['var']
 
+        # Precompute the terms that do not depend on the other factors, with one product per view
         M = len(Y)
+        foo = np.zeros((self.N,self.dim[1]))
+        tauYSW = np.zeros((self.N,self.dim[1]))
+        for m in range(M):
+            foo += np.dot(tau[m], SWtmp[m]["ESWW"])
+            tauYSW += np.dot(tau[m]*Y[m], SWtmp[m]["E"])
+
         for k in latent_variables:
-            foo = s.zeros((self.N,))
-            bar = s.zeros((self.N,))
+            bar = tauYSW[:,k].copy()
             for m in range(M):
-                foo += np.dot(tau[m], SWtmp[m]["ESWW"][:,k])
-
-                bar_tmp1 = SWtmp[m]["E"][:,k]
+                # tau-weighted products of the weights of factor k with all factors, tauSWkSW[n,j] = sum_d tau[n,d]*SW[d,k]*SW[d,j]
+                tauSWkSW = np.dot(tau[m], SWtmp[m]["E"]*SWtmp[m]["E"][:,k,None])
 
-                bar_tmp2 = - s.dot(Qmean[:, s.arange(self.dim[1]) != k], SWtmp[m]["E"][:, s.arange(self.dim[1]) != k].T)
-                bar_tmp2 += Y[m]
-                bar_tmp2 *= tau[m]
-                bar += np.dot(bar_tmp2, bar_tmp1)
+                # contribution of all factors except k
+                bar -= (tauSWkSW*Qmean).sum(axis=1) - Qmean[:,k]*tauSWkSW[:,k]
 
-            Qvar[:,k] = 1./(Alpha[:,k]+foo)
+            Qvar[:,k] = 1./(Alpha[:,k]+foo[:,k])
             Qmean[:,k] = Qvar[:,k] * bar
 
         # Save updated parameters of the Q distribution
         self.Q.setParameters(mean=Qmean, var=Qvar)
 
+        # Invalidate the cached E[Z]'E[Z]
+        self.ZtZ = None
+
+    def getZtZ(self):
+        # Method to return E[Z]'E[Z], which is computed at most once per update of the node
+        if self.ZtZ is None:
+            Z = self.getExpectation()
+            self.ZtZ = np.dot(Z.T,Z)
+        return self.ZtZ
+
+    def removeFactors(self, idx, axis=None):
+        super(Z_Node,self).removeFactors(idx, axis)
+        self.ZtZ = None
+
     def calculateELBO(self):
         # Collect parameters and expectations of current node
         Qpar,Qexp = self.Q.getParameters(), self.Q.getExpectations()
         Qmean, Qvar = Qpar['mean'], Qpar['var']
         QE, QE2 = Qexp['E'],Qexp['E2']
-        Alpha = { 'E':1./self.P.getParameters()["var"], 'lnE':s.log(1./self.P.getParameters()["var"]) }
+        Alpha = { 'E':1./self.P.getParameters()["var"], 'lnE':np.log(1./self.P.getParameters()["var"]) }
 
         # This ELBO term contains only cross entropy between Q and P,and entropy of Q. So the covariates should not intervene at all
         latent_variables = self.getLvIndex()
@@ -471,6 +526,6 @@ class Z_Node(UnivariateGaussian_Unobserved_Variational_Node):
         tmp2 = 0.5*Alpha["lnE"].sum()
 
         lb_p = tmp1 + tmp2
-        lb_q = -0.5*(s.log(Qvar).sum() + self.N*len(latent_variables))
+        lb_q = -0.5*(np.log(Qvar).sum() + self.N*len(latent_variables))
 
         return lb_p-lb_q
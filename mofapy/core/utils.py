@@ -1,4 +1,3 @@
-from __future__ import division
 from time import sleep
 from copy import deepcopy
 
@@ -86,7 +85,7 @@ def maskData(data, data_opts):
             # idxMask = np.arange(Nsamples2Mask)
             # print idxMask
             tmp = data[m].copy()
-            tmp.ix[idxMask,:] = pd.np.nan
+            tmp.iloc[idxMask,:] = np.nan
             data[m] = tmp
 
     return data
@@ -225,9 +224,9 @@ def corr(A,B):
 
 # NOT HERE
 def logdet(X):
-    return np.log(np.linalg.det(X))
-    # UC = np.linalg.cholesky(X)
-    # return 2*sum(np.log(np.diag(UC)))
+    """ Method to compute the log-determinant of a symmetric positive definite matrix using its Cholesky factor """
+    UC = np.linalg.cholesky(X)
+    return 2*np.log(np.diag(UC)).sum()
 
 
 # NOT HERE
@@ -341,13 +340,13 @@ def saveExpectations(model, hdf5, view_names=None):
                 if exp  is not None:
                     if type(exp) == ma.core.MaskedArray:
                         tmp = ma.filled(exp, fill_value=np.nan)
-                        node_subgrp.create_dataset(view, data=tmp.T)
+                        node_subgrp.create_dataset(view, data=tmp.T, compression="gzip")
                     else:
-                        node_subgrp.create_dataset(view, data=exp.T)
+                        node_subgrp.create_dataset(view, data=exp.T, compression="gzip")
 
         # Single-view nodes
         else:
-            exp_grp.create_dataset(node, data=expectations["E"].T)
+            exp_grp.create_dataset(node, data=expectations["E"].T, compression="gzip")
 
 def saveTrainingStats(model, hdf5):
     """ Method to save the training statistics in an hdf5 file
@@ -383,7 +382,7 @@ def saveTrainingOpts(opts, hdf5):
         del opts['schedule']
 
     # Create HDF5 data set
-    hdf5.create_dataset("training_opts", data=np.array(list(opts.values()), dtype=np.float))
+    hdf5.create_dataset("training_opts", data=np.array(list(opts.values()), dtype=float))
     hdf5['training_opts'].attrs['names'] = np.asarray(list(opts.keys())).astype('S')
 
 def saveModelOpts(opts, hdf5):
@@ -433,7 +432,7 @@ def saveTrainingData(model, hdf5, data, view_names=None, sample_names=None, feat
 
     for m in range(len(data)):
         view = view_names[m] if view_names is not None else str(m)
-        data_grp.create_dataset(view, data=data[m].T)
+        data_grp.create_dataset(view, data=data[m].T, compression="gzip")
         intercept_grp.create_dataset(view, data=np.nanmean(data[m],axis=0))
         # if likelihoods[m] is "gaussian":
         # else:
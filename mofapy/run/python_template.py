@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from mofapy.core.entry_point import entry_point
 
@@ -5,9 +6,9 @@ from mofapy.core.entry_point import entry_point
 # Be careful to use the right delimiter, and make sure that you use the right arguments from pandas.read_csv to load the row names and column names, if appropriate.
 M = 3 # Number of views
 data =  [None]*M
-data[0] = pd.read_csv("(...)/view_0.txt", delimiter=" ").astype(pd.np.float32)
-data[1] = pd.read_csv("(...).txt", delimiter=" ").astype(pd.np.float32)
-data[2] = pd.read_csv("(...).txt", delimiter=" ").astype(pd.np.float32)
+data[0] = pd.read_csv("(...)/view_0.txt", delimiter=" ").astype(np.float32)
+data[1] = pd.read_csv("(...).txt", delimiter=" ").astype(np.float32)
+data[2] = pd.read_csv("(...).txt", delimiter=" ").astype(np.float32)
 
 # Initialise entry point
 ep = entry_point()
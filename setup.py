@@ -4,7 +4,7 @@ from setuptools import find_packages
 import sys
 
 def setup_package():
-  install_requires = ['pandas', 'scipy', 'numpy', 'sklearn', 'argparse', 'h5py']
+  install_requires = ['pandas', 'scipy', 'numpy', 'scikit-learn', 'h5py', 'joblib']
   metadata = dict(
       name = 'mofapy',
       version = '1.1',
@@ -14,13 +14,14 @@ def setup_package():
       author_email = 'ricard.argelaguet@gmail.com',
       license = 'LGPL-3.0',
       packages = find_packages(),
+      python_requires = '>=3.6',
       install_requires = install_requires
     )
 
   setup(**metadata)
 
 if __name__ == '__main__':
-  if sys.version_info < (2,7):
-    sys.exit('Sorry, Python < 2.7 is not supported')
+  if sys.version_info < (3,6):
+    sys.exit('Sorry, Python < 3.6 is not supported')
     
   setup_package()
\ No newline at end of file